@@ -10,7 +10,7 @@ from pathlib import Path
 ROOT_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT_DIR))
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
@@ -36,11 +36,18 @@ def check_directories():
 # 检查目录
 check_directories()
 
-# 创建FastAPI应用
+# 重放上次异常退出时未完成的多文件提交
+from backend.utils import file_transaction
+file_transaction.recover()
+
+from backend.utils.fast_json import FastJSONResponse
+
+# 创建FastAPI应用（默认使用快速 JSON 编码器）
 app = FastAPI(
     title="LocalGame API",
     description="游戏展示平台的后端API",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # 配置CORS
@@ -56,19 +63,43 @@ app.add_middleware(
 app.mount("/css", StaticFiles(directory=str(ROOT_DIR / "frontend/css")), name="css")
 app.mount("/js", StaticFiles(directory=str(ROOT_DIR / "frontend/js")), name="js")
 app.mount("/pages", StaticFiles(directory=str(ROOT_DIR / "frontend/pages")), name="pages")
-app.mount("/images", StaticFiles(directory=str(ROOT_DIR / "frontend/images")), name="images")
 app.mount("/admin", StaticFiles(directory=str(ROOT_DIR / "frontend/admin")), name="admin")
 
 # 用户媒体文件的静态服务（通过 API 路由实现）
-from fastapi.responses import FileResponse as FR
+from fastapi.responses import FileResponse as FR, Response
 from fastapi import HTTPException as HE
+from backend.services.image_optimizer import resolve_image
+from backend.services import game_stats
+from backend.utils import response_cache
+from backend.utils.response_cache import not_modified_since
+
+@app.get("/images/{filename}")
+async def serve_frontend_image(filename: str, request: Request):
+    """提供前端图片（客户端支持时返回更小的 WebP 版本，支持条件请求）"""
+    file_path = resolve_image(filename, request.headers.get("accept"))
+    if file_path is None:
+        raise HE(status_code=404, detail="文件不存在")
+    # ETag / Last-Modified 按实际返回的文件（原图或 WebP）生成
+    response = FR(str(file_path), headers={"Vary": "Accept"}, stat_result=os.stat(file_path))
+    if response_cache.etag_matches(request, response.headers["etag"]) or (
+        "if-none-match" not in request.headers
+        and not_modified_since(request.headers.get("if-modified-since"), response.headers.get("last-modified"))
+    ):
+        return Response(status_code=304, headers={
+            name: response.headers[name]
+            for name in ("etag", "last-modified", "vary")
+            if name in response.headers
+        })
+    return response
 
 @app.get("/media/games/{user_folder}/{filename}")
 async def serve_game_file(user_folder: str, filename: str):
-    """提供用户游戏文件"""
+    """提供用户游戏文件（每次请求计一次游玩）"""
     file_path = ROOT_DIR / "data" / "users" / user_folder / "games" / filename
     if not file_path.exists():
         raise HE(status_code=404, detail="文件不存在")
+    # 只在内存中计数，后台定期写盘
+    game_stats.record_play(f"/media/games/{user_folder}/{filename}")
     return FR(str(file_path))
 
 @app.get("/media/images/{user_folder}/{filename}")
@@ -116,45 +147,17 @@ app.include_router(bulletin.router, prefix="/api/bulletin", tags=["通告"])
 # 游戏路由
 app.include_router(game.router, prefix="/api/game", tags=["游戏"])
 
-def convert_background_to_webp():
-    """将背景图片转换为 WebP 格式"""
-    from PIL import Image
-    from pathlib import Path
-    
+def ensure_background_reference():
+    """确保 CSS 引用的背景图片存在（WebP 版本由图片优化服务按需提供）"""
     images_dir = ROOT_DIR / "frontend" / "images"
-    images_dir.mkdir(exist_ok=True)
-    
-    # 检查是否已有 WebP 格式
-    webp_path = images_dir / "background.webp"
-    if webp_path.exists():
-        print("✅ 背景图片已是 WebP 格式")
+    if (images_dir / "background.webp").exists():
         return "background.webp"
     
-    # 查找其他格式的背景图片
+    # 没有 WebP 原图时直接引用其他格式，由 /images 路由协商返回 WebP
     for ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp']:
-        bg_path = images_dir / f"background{ext}"
-        if bg_path.exists():
-            print(f"🔄 发现 {bg_path.name}，正在转换为 WebP 格式...")
-            try:
-                # 打开图片并转换为 WebP
-                img = Image.open(bg_path)
-                # 如果是 PNG 带透明度，保留 alpha 通道
-                if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
-                    img = img.convert('RGBA')
-                else:
-                    img = img.convert('RGB')
-                
-                # 保存为 WebP，质量设为 85
-                img.save(webp_path, 'WEBP', quality=85)
-                print(f"✅ 成功转换为 WebP 格式: {webp_path.name}")
-                
-                # 更新 CSS 文件
-                update_css_background_path("background.webp")
-                
-                return "background.webp"
-            except Exception as e:
-                print(f"❌ 转换失败: {e}")
-                return f"background{ext}"
+        if (images_dir / f"background{ext}").exists():
+            update_css_background_path(f"background{ext}")
+            return f"background{ext}"
     
     print("⚠️  未找到背景图片文件")
     return None
@@ -181,9 +184,11 @@ def update_css_background_path(filename):
 if __name__ == "__main__":
     import uvicorn
     
-    # 转换背景图片为 WebP 格式
+    # 转换前端图片为 WebP 格式（源文件未变化时跳过）
+    from backend.services.image_optimizer import optimize_frontend_images
     print("")
-    convert_background_to_webp()
+    optimize_frontend_images()
+    ensure_background_reference()
     print("")
     
     print("启动服务器...")
@@ -208,7 +213,7 @@ if __name__ == "__main__":
         host="0.0.0.0",              # 监听所有网络接口
         port=8000,
         log_level="info",            # 显示info级别日志（便于调试）
-        limit_concurrency=200,       # 2核2G服务器的合理并发数
+        limit_concurrency=1000,      # 含留言板 SSE 长连接（最多500个，空闲时几乎不占资源）
         timeout_keep_alive=60,       # Keep-Alive超时（节省连接资源）
         access_log=False             # 禁用访问日志（节省I/O）
     )
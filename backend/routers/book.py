@@ -1,47 +1,96 @@
 """
 书籍内容滚动路由
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Query
 from pathlib import Path
 import os
+import secrets
+
+from backend.utils import response_cache, single_flight
+from backend.services import book_index, book_reader
 
 router = APIRouter()
 
 # 书籍文件夹路径（根目录）
 BOOK_DIR = Path(__file__).parent.parent.parent / "book"
 
+def load_book_window(offset: int, limit: int) -> dict:
+    """
+    读取书籍内容窗口（跨文件连续的非空行）
+    读到末尾时 next_offset 回到 0，便于循环滚动
+    """
+    lines = book_reader.read_lines(offset, limit)
+    corpus_lines = book_reader.total_lines()
+    next_offset = offset + len(lines)
+    
+    # 返回合并后的内容，用空格连接
+    return {
+        "content": " ".join(lines) if lines else "",
+        "total_lines": len(lines),
+        "offset": offset,
+        "next_offset": next_offset if next_offset < corpus_lines else 0,
+        "corpus_lines": corpus_lines
+    }
+
+
+# 响应缓存对应的书籍版本号
+_book_generation = None
+
+
 @router.get("/content")
-async def get_book_content():
+async def get_book_content(
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    random: bool = Query(False)
+):
     """
     获取书籍内容用于滚动显示
-    只返回前100行内容，避免页面卡顿
+    :param offset: 起始行（只计非空行）
+    :param limit: 行数（最多1000）
+    :param random: 为 true 时随机选取一个窗口
     """
-    if not BOOK_DIR.exists():
-        return {"content": ""}
+    global _book_generation
     
-    content_lines = []
-    max_lines = 100  # 只读取前100行
+    # 书籍文件没有写接口，每次请求检查一次文件签名，变化时重新加载（并发请求合并为一次）
+    if not book_reader.is_current():
+        await single_flight.run("book:lines", book_reader.load_books)
     
-    # 遍历 book 目录下的所有 txt 文件
-    for file_path in BOOK_DIR.glob("*.txt"):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line:  # 只保留非空行
-                        content_lines.append(line)
-                        if len(content_lines) >= max_lines:
-                            break
-            
-            if len(content_lines) >= max_lines:
-                break
-                
-        except Exception as e:
-            print(f"读取文件 {file_path} 失败: {e}")
-            continue
+    # 重新加载后失效缓存的窗口
+    if book_reader.generation() != _book_generation:
+        response_cache.invalidate("book")
+        _book_generation = book_reader.generation()
+    
+    # 随机窗口每次不同，不经过响应缓存
+    if random:
+        corpus_lines = book_reader.total_lines()
+        offset = secrets.randbelow(max(1, corpus_lines - limit + 1))
+        return load_book_window(offset, limit)
+    
+    return await response_cache.cached_response(
+        request, ["book"], lambda: load_book_window(offset, limit)
+    )
+
+
+@router.get("/search")
+async def search_book(
+    q: str = Query(..., min_length=1),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    书籍全文检索（基于后缀数组）
+    :param q: 检索内容
+    :param offset: 跳过的结果数
+    :param limit: 每页数量（最多100）
+    """
+    # 首次检索或书籍变化时加载索引（并发请求只加载一次）
+    if not book_index.is_current():
+        await single_flight.run("book:index", book_index.load_books)
+    
+    total, results = book_index.search(q, offset=offset, limit=limit)
     
-    # 返回合并后的内容，用空格连接
     return {
-        "content": " ".join(content_lines) if content_lines else "",
-        "total_lines": len(content_lines)
+        "total": total,
+        "results": results
     }
@@ -3,68 +3,118 @@
 - 游客可以查看留言
 - 登录用户才能发送留言
 - 管理员可以删除任何留言
+- 新消息 / 删除通过 SSE 实时推送，轮询接口作为兼容后备
+- 消息存储见 backend/services/chat_store.py，轮询可用 since 只取增量
 """
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Dict, Any, Optional
-from pathlib import Path
-import json
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from typing import Dict, Any, Optional, Set
+import asyncio
 import uuid
 from datetime import datetime
 from pydantic import BaseModel
 
 from backend.routers.auth import get_current_user, get_current_admin
+from backend.services import chat_store
+from backend.utils import fast_json, response_cache
 
 router = APIRouter()
 
-# 聊天消息文件路径（使用新的 data 目录）
-DATA_DIR = Path(__file__).parent.parent.parent / "data"
-CHAT_DIR = DATA_DIR / "chat"
-CHAT_FILE = CHAT_DIR / "messages.json"
+# 每个 SSE 连接的待发送事件上限，超出说明客户端过慢，断开后由客户端重连
+SUBSCRIBER_QUEUE_SIZE = 100
 
+# SSE 连接数上限，超出时客户端退回轮询
+MAX_SUBSCRIBERS = 500
+
+# 心跳间隔（秒），用于保持连接并检测客户端断开
+HEARTBEAT_INTERVAL = 15
+
+# 历史分页每页最多返回的消息数
+MAX_HISTORY_PAGE = 500
+
+# 所有 SSE 连接的发送队列
+_subscribers: Set[asyncio.Queue] = set()
 
 class ChatMessage(BaseModel):
     """发送消息请求"""
     text: str
 
 
-class ChatResponse(BaseModel):
-    """聊天响应模型"""
-    messages: List[Dict[str, Any]]
+def notify(event: str, data: Dict[str, Any]):
+    """消息变化：丢弃预编码的响应并推送给所有在线连接"""
+    response_cache.invalidate("chat")
+    broadcast(event, data)
 
 
-def read_messages() -> List[Dict[str, Any]]:
-    """读取聊天消息"""
-    if not CHAT_FILE.exists():
-        return []
-    
-    with open(CHAT_FILE, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-        return data.get('messages', [])
-
-
-def write_messages(messages: List[Dict[str, Any]]):
-    """写入聊天消息"""
-    CHAT_FILE.parent.mkdir(parents=True, exist_ok=True)
+def broadcast(event: str, data: Dict[str, Any]):
+    """
+    向所有 SSE 连接广播事件
+    每个事件只序列化一次；队列已满的慢连接直接断开
+    """
+    payload = b"event: " + event.encode() + b"\ndata: " + fast_json.dumps(data) + b"\n\n"
     
-    with open(CHAT_FILE, 'w', encoding='utf-8') as f:
-        json.dump({'messages': messages}, f, ensure_ascii=False, indent=2)
+    for queue in list(_subscribers):
+        try:
+            queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # 清空队列并放入结束标记，连接随后关闭
+            _subscribers.discard(queue)
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
 
 
 # === 公开接口 ===
 
-@router.get("/messages", response_model=ChatResponse)
-async def get_messages(limit: int = 100):
+@router.get("/messages")
+async def get_messages(
+    request: Request,
+    limit: int = 100,
+    since: Optional[int] = None,
+    before: Optional[int] = Query(None, ge=1)
+):
     """
     获取聊天消息（公开访问）
+    消息为内部可信数据，直接返回缓存的预编码 JSON，不经过模型校验
+    
+    - 不带 since：返回最近 limit 条消息及当前序号 seq
+    - 带 since：只返回该序号之后的新消息和被删除的消息 id（deleted）；
+      游标过旧时返回完整列表并标记 reset
+    - 带 before：返回序号小于 before 的 limit 条历史消息（包括已归档的消息），
+      响应中的 next_before 用于继续向前翻页
+    - 消息未变化时按 If-None-Match 返回 304，不读取文件
     """
+    def build():
+        seq = chat_store.current_seq()
+        return {"messages": chat_store.recent(limit), "seq": seq}
+    
+    async def build_history():
+        return await run_in_threadpool(chat_store.history, before, min(limit, MAX_HISTORY_PAGE) if limit > 0 else 100)
+    
     try:
-        messages = read_messages()
+        if before is not None:
+            return await response_cache.cached_response(request, ["chat"], build_history)
+        
+        if since is None:
+            return await response_cache.cached_response(request, ["chat"], build)
+        
+        # ETag 只取决于当前序号：since 等于当前序号时增量必然为空，可以返回 304
+        seq = chat_store.current_seq()
+        etag = f'"chat-{seq}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if since == seq and response_cache.etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
         
-        # 限制返回数量
-        if limit > 0:
-            messages = messages[-limit:]
+        delta = chat_store.messages_since(since)
+        if delta is None:
+            data = build()
+            data["deleted"] = []
+            data["reset"] = True
+        else:
+            data = {**delta, "seq": seq, "reset": False}
         
-        return {"messages": messages}
+        return fast_json.raw_json(fast_json.dumps(data), headers=headers)
     
     except Exception as e:
         raise HTTPException(
@@ -73,6 +123,49 @@ async def get_messages(limit: int = 100):
         )
 
 
+@router.get("/stream")
+async def stream_messages(request: Request):
+    """
+    实时消息推送（Server-Sent Events，公开访问）
+    事件：message（新消息）、delete（删除，data 为 {"id", "seq"}）、clear（清空，data 为 {"seq"}）
+    """
+    if len(_subscribers) >= MAX_SUBSCRIBERS:
+        raise HTTPException(
+            status_code=503,
+            detail="实时连接已满，请使用轮询"
+        )
+    
+    queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+    _subscribers.add(queue)
+    
+    async def event_stream():
+        try:
+            # 断线后 3 秒重连
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield b": ping\n\n"
+                    continue
+                if payload is None:
+                    break
+                yield payload
+        finally:
+            _subscribers.discard(queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 # === 需要登录的接口 ===
 
 @router.post("/messages")
@@ -84,9 +177,6 @@ async def send_message(
     发送新消息（需要登录）
     """
     try:
-        # 读取现有消息
-        messages = read_messages()
-        
         # 创建新消息（包含用户信息）
         new_message = {
             "id": str(uuid.uuid4()),
@@ -97,15 +187,9 @@ async def send_message(
             "timestamp": datetime.now().isoformat()
         }
         
-        # 添加到消息列表
-        messages.append(new_message)
-        
-        # 只保留最近200条消息
-        if len(messages) > 200:
-            messages = messages[-200:]
-        
-        # 写入文件
-        write_messages(messages)
+        # 追加到消息存储（超出容量时自动丢弃最旧的消息）
+        new_message = chat_store.append(new_message)
+        notify("message", new_message)
         
         return {
             "success": True,
@@ -130,24 +214,15 @@ async def delete_message(
     删除单条消息（仅管理员）
     """
     try:
-        messages = read_messages()
-        
-        # 查找要删除的消息
-        message_to_delete = None
-        for msg in messages:
-            if msg.get('id') == message_id:
-                message_to_delete = msg
-                break
+        seq = chat_store.delete(message_id)
         
-        if not message_to_delete:
+        if seq is None:
             raise HTTPException(
                 status_code=404,
                 detail="消息不存在"
             )
         
-        # 删除消息
-        messages = [msg for msg in messages if msg.get('id') != message_id]
-        write_messages(messages)
+        notify("delete", {"id": message_id, "seq": seq})
         
         return {
             "success": True,
@@ -169,7 +244,8 @@ async def clear_all_messages(current_admin: dict = Depends(get_current_admin)):
     清空所有消息（仅管理员）
     """
     try:
-        write_messages([])
+        seq = chat_store.clear()
+        notify("clear", {"seq": seq})
         return {
             "success": True,
             "message": "所有消息已清空"
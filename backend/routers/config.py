@@ -2,10 +2,12 @@
 配置API路由（公开接口）
 返回前端需要的配置信息
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pathlib import Path
 import json
 
+from backend.utils import response_cache
+
 router = APIRouter()
 
 # 配置文件路径（根目录）
@@ -19,14 +21,32 @@ def read_config() -> dict:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"读取配置失败: {str(e)}")
 
+# 上次缓存时配置文件的修改时间
+_config_mtime = None
+
+
 @router.get("/stream")
-async def get_stream_config():
+async def get_stream_config(request: Request):
     """
     获取电台流配置（公开接口）
     """
-    config = read_config()
+    global _config_mtime
+    
+    # 配置文件由管理员手动编辑，通过修改时间检测变化
+    try:
+        mtime = CONFIG_FILE.stat().st_mtime
+    except OSError:
+        mtime = None
+    if mtime != _config_mtime:
+        response_cache.invalidate("config")
+        _config_mtime = mtime
+    
+    def build():
+        config = read_config()
+        
+        return {
+            "url": config.get('stream_url', 'https://n10as.radiocult.fm/stream'),
+            "name": config.get('stream_name', 'RadioCult.fm')
+        }
     
-    return {
-        "url": config.get('stream_url', 'https://n10as.radiocult.fm/stream'),
-        "name": config.get('stream_name', 'RadioCult.fm')
-    }
+    return await response_cache.cached_response(request, ["config"], build)
@@ -0,0 +1,196 @@
+"""
+草稿 / 发布两态内容的通用路由
+- 通告（bulletin）、公告（announcement）等内容类型共用同一套接口
+- 数据来自 ContentCollection 的内存视图，写操作后按 tag 失效响应缓存
+"""
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from typing import Optional
+from pydantic import BaseModel
+
+from backend.routers.auth import get_current_admin
+from backend.services.content_collection import ContentCollection
+from backend.utils import fast_json, response_cache
+
+
+# === Schema ===
+
+class ContentCreate(BaseModel):
+    """创建内容"""
+    title: str
+    content: str
+
+
+class ContentUpdate(BaseModel):
+    """更新内容"""
+    title: Optional[str] = None
+    content: Optional[str] = None
+
+
+def create_router(collection: ContentCollection, item_key: str, list_key: str, label: str = "通告") -> APIRouter:
+    """
+    创建一种内容类型的路由
+
+    Args:
+        collection: 内容存储
+        item_key: 单条内容在响应中的字段名（如 "announcement"）
+        list_key: 列表在响应中的字段名，同时作为响应缓存的 tag（如 "announcements"）
+        label: 提示信息中的内容名称
+    """
+    router = APIRouter()
+
+    def not_found():
+        return HTTPException(
+            status_code=404,
+            detail=f"{label}不存在"
+        )
+
+    # === 公开接口 ===
+
+    @router.get("/list")
+    async def get_published(
+        request: Request,
+        cursor: Optional[str] = None,
+        limit: int = Query(20, ge=1, le=100),
+        view: str = Query("summary", pattern="^(summary|full)$")
+    ):
+        """
+        获取已发布的列表（公开访问），按发布时间倒序分页
+        :param cursor: 上一页返回的 next_cursor，不传表示第一页
+        :param limit: 每页数量（最多100）
+        :param view: summary 只返回 id、标题、日期和正文节选，full 返回完整内容
+        """
+        def build():
+            try:
+                posts, next_cursor = collection.published_page(cursor, limit, summary=view == "summary")
+            except ValueError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="无效的分页游标"
+                )
+            return {
+                "success": True,
+                list_key: posts,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None
+            }
+
+        return await response_cache.cached_response(request, [list_key], build)
+
+    @router.get("/detail/{post_id}")
+    async def get_detail(request: Request, post_id: str):
+        """
+        获取单条已发布内容的完整信息（公开访问）
+        """
+        def build():
+            post = collection.get_published(post_id)
+            if post is None:
+                raise not_found()
+            return {
+                "success": True,
+                item_key: post
+            }
+
+        return await response_cache.cached_response(request, [list_key], build)
+
+    # === 管理员接口 ===
+
+    @router.get("/admin/list")
+    async def get_all(current_admin: dict = Depends(get_current_admin)):
+        """
+        获取所有内容（草稿 + 已发布），按创建时间倒序 - 仅管理员
+        """
+        # 逐批从内存视图中取出并流式输出，不生成完整列表
+        return fast_json.collection_response(list_key, collection.iter_posts(), head={"success": True})
+
+    @router.post("/admin/create")
+    async def create(
+        request: ContentCreate,
+        current_admin: dict = Depends(get_current_admin)
+    ):
+        """
+        创建（草稿）- 仅管理员
+        """
+        post = collection.create(request.title, request.content)
+
+        return {
+            "success": True,
+            "message": f"{label}创建成功（草稿状态）",
+            item_key: post
+        }
+
+    @router.put("/admin/{post_id}")
+    async def update(
+        post_id: str,
+        request: ContentUpdate,
+        current_admin: dict = Depends(get_current_admin)
+    ):
+        """
+        更新 - 仅管理员
+        如果是已发布的，自动撤回到草稿
+        """
+        post = collection.update(post_id, request.title, request.content)
+        if post is None:
+            raise not_found()
+        response_cache.invalidate(list_key)
+
+        return {
+            "success": True,
+            "message": f"{label}更新成功",
+            item_key: post
+        }
+
+    @router.post("/admin/{post_id}/publish")
+    async def publish(
+        post_id: str,
+        current_admin: dict = Depends(get_current_admin)
+    ):
+        """
+        发布 - 仅管理员
+        """
+        post = collection.publish(post_id)
+        if post is None:
+            raise not_found()
+        response_cache.invalidate(list_key)
+
+        return {
+            "success": True,
+            "message": f"{label}已发布",
+            item_key: post
+        }
+
+    @router.post("/admin/{post_id}/unpublish")
+    async def unpublish(
+        post_id: str,
+        current_admin: dict = Depends(get_current_admin)
+    ):
+        """
+        撤回 - 仅管理员
+        """
+        post = collection.unpublish(post_id)
+        if post is None:
+            raise not_found()
+        response_cache.invalidate(list_key)
+
+        return {
+            "success": True,
+            "message": f"{label}已撤回",
+            item_key: post
+        }
+
+    @router.delete("/admin/{post_id}")
+    async def delete(
+        post_id: str,
+        current_admin: dict = Depends(get_current_admin)
+    ):
+        """
+        删除 - 仅管理员
+        """
+        collection.delete(post_id)
+        response_cache.invalidate(list_key)
+
+        return {
+            "success": True,
+            "message": f"{label}已删除"
+        }
+
+    return router
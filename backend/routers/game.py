@@ -1,17 +1,22 @@
 """
 游戏管理路由
 """
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Request, Query
 from fastapi.responses import FileResponse
-from typing import Optional, List
+from typing import Optional, List, Dict
 from pathlib import Path
+from collections import OrderedDict
 import json
 import uuid
 from datetime import datetime
 import shutil
+from pydantic import BaseModel, Field
 
 from backend.routers.auth import get_current_user, get_current_admin
 from backend.utils.user_manager import get_user_by_id
+from backend.utils import fast_json, response_cache, single_flight, file_transaction
+from backend.utils.id_generator import new_id
+from backend.services import search_index, suggest_index, similar_games, game_stats
 
 router = APIRouter()
 
@@ -20,6 +25,30 @@ DATA_DIR = Path(__file__).parent.parent.parent / "data"
 USERS_DIR = DATA_DIR / "users"
 
 
+# 游戏列表 fields= 可选的字段（excerpt 为简介节选）
+CATALOG_FIELDS = {
+    "id", "title", "content", "excerpt", "thumbnail", "game_file",
+    "author_id", "author_name", "created_at", "updated_at", "published_at"
+}
+
+# 简介节选的最大字符数
+EXCERPT_LENGTH = 50
+
+# 单次批量操作最多包含的游戏数
+MAX_BATCH_SIZE = 500
+
+# 缓存"我的游戏"视图的用户数（超出后淘汰最久未访问的用户）
+MY_GAMES_CACHE_SIZE = 256
+
+# 用户文件夹 -> 预编码的"我的游戏"响应
+_my_games_cache: "OrderedDict[str, bytes]" = OrderedDict()
+
+
+class BatchRequest(BaseModel):
+    """批量操作请求"""
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
 # === 辅助函数 ===
 
 def get_user_game_file(user_folder: str, status: str) -> Path:
@@ -39,10 +68,41 @@ def load_games(user_folder: str, status: str) -> List[dict]:
 
 def save_games(user_folder: str, status: str, games: List[dict]):
     """保存游戏列表"""
-    file_path = get_user_game_file(user_folder, status)
-    file_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump({'posts': games}, f, ensure_ascii=False, indent=2)
+    if status == 'published':
+        save_user_games(user_folder, published=games)
+    else:
+        save_user_games(user_folder, drafts=games)
+
+
+def save_user_games(user_folder: str, drafts: Optional[List[dict]] = None,
+                    published: Optional[List[dict]] = None):
+    """
+    在一次提交中保存用户的草稿和 / 或已发布列表
+    同时传入两者时原子写入，异常退出后不会只更新其中一个文件
+    """
+    documents = {}
+    if drafts is not None:
+        documents[get_user_game_file(user_folder, 'drafts')] = {'posts': drafts}
+    if published is not None:
+        documents[get_user_game_file(user_folder, 'published')] = {'posts': published}
+    file_transaction.commit(documents)
+    
+    # 上传 / 编辑 / 发布 / 撤回 / 删除都经过这里，丢弃该用户的"我的游戏"视图
+    _my_games_cache.pop(user_folder, None)
+    
+    if published is not None:
+        on_published_changed(user_folder, published)
+
+
+def on_published_changed(user_folder: str, published: List[dict]):
+    """
+    用户的已发布游戏发生变化（发布 / 撤回 / 编辑 / 删除）
+    同步失效响应缓存，增量更新搜索索引、补全索引，并在后台重算相似游戏
+    """
+    response_cache.invalidate("games")
+    search_index.update_user(user_folder, published)
+    suggest_index.update_user(user_folder, published)
+    similar_games.schedule_refresh()
 
 
 def get_game_by_id(user_folder: str, game_id: str) -> Optional[dict]:
@@ -88,6 +148,42 @@ def get_all_published_games() -> List[dict]:
     return all_games
 
 
+def project_game(game: dict, fields: List[str]) -> dict:
+    """只保留指定字段"""
+    result = {}
+    for field in fields:
+        if field == "excerpt":
+            content = game.get('content') or ''
+            result[field] = content if len(content) <= EXCERPT_LENGTH else content[:EXCERPT_LENGTH] + '...'
+        else:
+            result[field] = game.get(field)
+    return result
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """解析 fields= 参数，包含未知字段时返回 400"""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in CATALOG_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"未知字段: {', '.join(unknown)}"
+        )
+    return names
+
+
+async def load_published_games_shared() -> List[dict]:
+    """
+    获取所有已发布游戏（并发请求合并为一次磁盘扫描）
+    返回的列表由多个请求共享，调用方不应修改
+    合并键包含 games 的失效次数：失效前开始的扫描不会被失效后的请求复用
+    """
+    key = f"game:published:{response_cache.generation('games')}"
+    return await single_flight.run(key, get_all_published_games)
+
+
 # === 游戏上传 ===
 
 @router.post("/upload")
@@ -123,8 +219,8 @@ async def upload_game(
     game_content = await game_file.read()
     thumbnail_content = await thumbnail.read()
     
-    # 生成唯一ID
-    game_id = datetime.now().strftime("%Y%m%d%H%M%S")
+    # 生成唯一ID（按创建时间排序）
+    game_id = new_id()
     file_uuid = uuid.uuid4().hex
     
     # 保存文件
@@ -178,67 +274,179 @@ async def upload_game(
 # === 获取游戏列表 ===
 
 @router.get("/list")
-async def get_published_games():
+async def get_published_games(
+    request: Request,
+    stream: bool = Query(False),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    fields: Optional[str] = None
+):
     """
-    获取所有已发布的游戏列表（公开访问）
+    获取已发布的游戏列表（公开访问），按发布时间倒序
+    :param stream: 为 true 时逐块流式输出，不生成完整的响应体
+    :param cursor: 上一页返回的 next_cursor
+    :param limit: 每页数量（最多100）；传入 limit 或 cursor 时分页返回，否则返回全部
+    :param fields: 逗号分隔的字段列表（如 id,title,thumbnail,author_name），不传返回完整记录
     """
-    games = get_all_published_games()
-    return {
-        "success": True,
-        "games": games
-    }
+    field_list = parse_fields(fields)
+    
+    if limit is not None or cursor is not None:
+        # 首次访问时加载目录索引（并发请求只加载一次）
+        if not search_index.is_loaded():
+            await single_flight.run("search:index", search_index.ensure_loaded)
+        
+        def build_page():
+            try:
+                games, next_cursor = search_index.catalog_page(cursor, limit or 30)
+            except ValueError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="无效的分页游标"
+                )
+            if field_list:
+                games = [project_game(game, field_list) for game in games]
+            return {
+                "success": True,
+                "games": games,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None
+            }
+        
+        return await response_cache.cached_response(request, ["games"], build_page)
+    
+    if stream:
+        # 从内存目录中逐批取出并编码，不扫描磁盘，也不生成完整列表
+        if not search_index.is_loaded():
+            await single_flight.run("search:index", search_index.ensure_loaded)
+        games = search_index.iter_catalog()
+        if field_list:
+            games = (project_game(game, field_list) for game in games)
+        return fast_json.collection_response("games", games, head={"success": True}, stream=True)
+    
+    async def build():
+        games = await load_published_games_shared()
+        if field_list:
+            games = [project_game(game, field_list) for game in games]
+        return {
+            "success": True,
+            "games": games
+        }
+    
+    return await response_cache.cached_response(request, ["games"], build)
+
+
+def build_my_games(user_folder: str) -> List[dict]:
+    """
+    用户的所有游戏（草稿 + 已发布），按创建时间（即 id）倒序
+    已发布的游戏在草稿中也有一份，按 id 去重：字段以草稿为准（编辑只修改草稿），
+    状态按是否在已发布列表中确定
+    """
+    published_ids = set()
+    games = {}
+    for game in load_games(user_folder, 'published'):
+        published_ids.add(game['id'])
+        games[game['id']] = game
+    for game in load_games(user_folder, 'drafts'):
+        games[game['id']] = game
+    for game_id, game in games.items():
+        games[game_id] = {**game, 'status': 'published' if game_id in published_ids else 'draft'}
+    
+    return [games[game_id] for game_id in sorted(games, reverse=True)]
 
 
 @router.get("/my-games")
 async def get_my_games(current_user: dict = Depends(get_current_user)):
     """
     获取当前用户的所有游戏（草稿 + 已发布）
+    视图按用户缓存，用户的游戏发生变化时失效
     """
     user_folder = current_user['folder']
     
-    drafts = load_games(user_folder, 'drafts')
-    published = load_games(user_folder, 'published')
+    body = _my_games_cache.get(user_folder)
+    if body is None:
+        body = fast_json.dumps({
+            "success": True,
+            "games": build_my_games(user_folder)
+        })
+        _my_games_cache[user_folder] = body
+        while len(_my_games_cache) > MY_GAMES_CACHE_SIZE:
+            _my_games_cache.popitem(last=False)
+    else:
+        _my_games_cache.move_to_end(user_folder)
     
-    # 合并并标记状态
-    all_games = []
-    for game in drafts:
-        game['status'] = 'draft'
-        all_games.append(game)
+    return fast_json.raw_json(body)
+
+
+# === 热门游戏 ===
+
+@router.get("/top")
+async def get_top_games(limit: int = Query(10, ge=1, le=50), fields: Optional[str] = None):
+    """
+    获取热门游戏排行（公开访问），按随时间衰减的游玩 / 浏览热度降序
+    计数定期批量写盘，排行在写盘时更新
+    :param limit: 数量（最多50）
+    :param fields: 逗号分隔的字段列表，不传返回完整记录
+    """
+    field_list = parse_fields(fields)
     
-    for game in published:
-        game['status'] = 'published'
-        all_games.append(game)
+    if not search_index.is_loaded():
+        await single_flight.run("search:index", search_index.ensure_loaded)
     
-    # 按创建时间倒序
-    all_games.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+    games = []
+    for game, stats in game_stats.top(limit):
+        if field_list:
+            game = project_game(game, field_list)
+        games.append({**game, **stats})
     
     return {
         "success": True,
-        "games": all_games
+        "games": games
     }
 
 
 # === 获取游戏详情 ===
 
 @router.get("/{game_id}")
-async def get_game_detail(game_id: str):
+async def get_game_detail(game_id: str, request: Request):
     """
     获取游戏详情（公开访问已发布的游戏）
+    每次成功返回计一次浏览
     """
-    # 在所有用户的已发布游戏中查找
-    all_games = get_all_published_games()
+    async def build():
+        # 在所有用户的已发布游戏中查找
+        all_games = await load_published_games_shared()
+        
+        for game in all_games:
+            if game['id'] == game_id:
+                return {
+                    "success": True,
+                    "game": game
+                }
+        
+        raise HTTPException(
+            status_code=404,
+            detail="游戏不存在或未发布"
+        )
     
-    for game in all_games:
-        if game['id'] == game_id:
-            return {
-                "success": True,
-                "game": game
-            }
+    response = await response_cache.cached_response(request, ["games"], build)
+    game_stats.record_view(game_id)
+    return response
+
+
+@router.get("/{game_id}/similar")
+async def get_similar_games(game_id: str, limit: int = Query(6, ge=1, le=20)):
+    """
+    获取相似游戏推荐（公开访问）
+    基于标题和简介的 TF-IDF 余弦相似度，邻居表在后台预先计算
+    """
+    # 首次请求时构建邻居表（并发请求只构建一次）
+    if not similar_games.is_built():
+        await single_flight.run("game:similar", similar_games.refresh)
     
-    raise HTTPException(
-        status_code=404,
-        detail="游戏不存在或未发布"
-    )
+    return {
+        "success": True,
+        "games": similar_games.similar(game_id, limit)
+    }
 
 
 # === 编辑游戏 ===
@@ -333,11 +541,11 @@ async def update_game(
     game['updated_at'] = datetime.now().isoformat()
     
     # 如果是已发布的，自动撤回到草稿（编辑后需要重新发布）
-    if status == 'published':
+    # 已发布的游戏在草稿中也有一份，先在草稿中找到，因此按记录的状态判断
+    if status == 'published' or game.get('status') == 'published':
         # 从已发布中删除
         published = load_games(user_folder, 'published')
         published = [g for g in published if g['id'] != game_id]
-        save_games(user_folder, 'published', published)
         
         # 更新状态
         game['status'] = 'draft'
@@ -355,7 +563,7 @@ async def update_game(
         else:
             # 添加新草稿
             drafts.append(game)
-        save_games(user_folder, 'drafts', drafts)
+        save_user_games(user_folder, drafts=drafts, published=published)
     else:
         # 更新草稿
         drafts = load_games(user_folder, 'drafts')
@@ -372,6 +580,167 @@ async def update_game(
     }
 
 
+# === 批量操作 ===
+
+# 操作 -> (需要管理员才能跨用户执行, 成功提示)
+BATCH_ACTIONS = {
+    "publish": (False, "游戏已发布"),
+    "unpublish": (True, "游戏已撤回到草稿"),
+    "delete": (True, "游戏已删除")
+}
+
+
+def find_owner_folders(game_ids: List[str]) -> Dict[str, str]:
+    """
+    查找游戏所属的用户文件夹（管理员批量操作）
+    已发布的游戏从搜索索引中查找，其余游戏只扫描一次所有用户的草稿
+    """
+    owners = {}
+    remaining = set()
+    for game_id in game_ids:
+        owner = search_index.owner_of(game_id)
+        if owner is not None:
+            owners[game_id] = owner
+        else:
+            remaining.add(game_id)
+    
+    if remaining and USERS_DIR.exists():
+        for user_dir in USERS_DIR.iterdir():
+            if not user_dir.is_dir():
+                continue
+            for game in load_games(user_dir.name, 'drafts'):
+                if game['id'] in remaining:
+                    owners[game['id']] = user_dir.name
+                    remaining.discard(game['id'])
+            if not remaining:
+                break
+    
+    return owners
+
+
+def apply_batch(user_folder: str, game_ids: List[str], action: str, current_user: dict) -> Dict[str, dict]:
+    """
+    对同一用户的多个游戏执行操作，草稿和已发布列表各只读写一次
+
+    Returns:
+        game_id -> 结果 {"id", "success", "status_code", "detail"}
+    """
+    is_admin = current_user['role'] == 'admin'
+    drafts = load_games(user_folder, 'drafts')
+    published = load_games(user_folder, 'published')
+    drafts_by_id = {g['id']: g for g in drafts}
+    published_by_id = {g['id']: g for g in published}
+    deleted = set()
+    results = {}
+    
+    def fail(game_id: str, status_code: int, detail: str):
+        results[game_id] = {"id": game_id, "success": False, "status_code": status_code, "detail": detail}
+    
+    for game_id in game_ids:
+        game = drafts_by_id.get(game_id) or published_by_id.get(game_id)
+        if game is None:
+            fail(game_id, 404, "游戏不存在")
+            continue
+        if game['author_id'] != current_user['id'] and not is_admin:
+            fail(game_id, 403, "无权操作此游戏")
+            continue
+        
+        if action == "publish":
+            if game_id not in drafts_by_id:
+                fail(game_id, 404, "游戏不存在或已发布")
+                continue
+            game['status'] = 'published'
+            game['published_at'] = datetime.now().isoformat()
+            published_by_id[game_id] = game
+        
+        elif action == "unpublish":
+            if game_id not in published_by_id:
+                fail(game_id, 404, "游戏不存在或未发布")
+                continue
+            game = drafts_by_id.get(game_id, game)
+            game['status'] = 'draft'
+            game['published_at'] = None
+            drafts_by_id[game_id] = game
+            del published_by_id[game_id]
+        
+        elif action == "delete":
+            # 删除文件
+            game_path = USERS_DIR / user_folder / "games" / Path(game['game_file']).name
+            thumb_path = USERS_DIR / user_folder / "images" / Path(game['thumbnail']).name
+            if game_path.exists():
+                game_path.unlink()
+            if thumb_path.exists():
+                thumb_path.unlink()
+            drafts_by_id.pop(game_id, None)
+            published_by_id.pop(game_id, None)
+            deleted.add(game_id)
+        
+        results[game_id] = {
+            "id": game_id,
+            "success": True,
+            "status_code": 200,
+            "detail": BATCH_ACTIONS[action][1]
+        }
+    
+    if any(result["success"] for result in results.values()):
+        # 保持原有顺序，新发布的追加到末尾
+        new_drafts = [drafts_by_id[g['id']] for g in drafts if g['id'] in drafts_by_id]
+        new_published = [published_by_id[g['id']] for g in published if g['id'] in published_by_id]
+        kept = {g['id'] for g in new_published}
+        new_published += [g for gid, g in published_by_id.items() if gid not in kept]
+        save_user_games(user_folder, drafts=new_drafts, published=new_published)
+    
+    return results
+
+
+@router.post("/batch/{action}")
+async def batch_games(action: str, request: BatchRequest, current_user: dict = Depends(get_current_user)):
+    """
+    批量发布 / 撤回 / 删除游戏
+    - action: publish、unpublish 或 delete
+    - 按所属用户分组，每个用户的游戏列表只读写一次
+    - 管理员可以撤回、删除任何用户的游戏
+    - 返回每个 id 的执行结果
+    """
+    if action not in BATCH_ACTIONS:
+        raise HTTPException(
+            status_code=404,
+            detail="不支持的批量操作"
+        )
+    
+    # 去重并保持顺序
+    game_ids = list(dict.fromkeys(request.ids))
+    
+    # 按用户文件夹分组
+    cross_user = BATCH_ACTIONS[action][0] and current_user['role'] == 'admin'
+    if cross_user:
+        owners = find_owner_folders(game_ids)
+    else:
+        owners = {game_id: current_user['folder'] for game_id in game_ids}
+    
+    groups: Dict[str, List[str]] = {}
+    for game_id in game_ids:
+        if game_id in owners:
+            groups.setdefault(owners[game_id], []).append(game_id)
+    
+    results = {}
+    for user_folder, ids in groups.items():
+        results.update(apply_batch(user_folder, ids, action, current_user))
+    
+    ordered = [
+        results.get(game_id) or {"id": game_id, "success": False, "status_code": 404, "detail": "游戏不存在"}
+        for game_id in game_ids
+    ]
+    succeeded = sum(1 for result in ordered if result["success"])
+    
+    return {
+        "success": True,
+        "results": ordered,
+        "succeeded": succeeded,
+        "failed": len(ordered) - succeeded
+    }
+
+
 # === 发布/撤回游戏 ===
 
 @router.post("/{game_id}/publish")
@@ -417,14 +786,12 @@ async def publish_game(game_id: str, current_user: dict = Depends(get_current_us
         # 添加新记录
         published.append(game)
     
-    save_games(user_folder, 'published', published)
-    
     # 同时更新草稿中的状态
     for i, g in enumerate(drafts):
         if g['id'] == game_id:
             drafts[i] = game
             break
-    save_games(user_folder, 'drafts', drafts)
+    save_user_games(user_folder, drafts=drafts, published=published)
     
     return {
         "success": True,
@@ -459,7 +826,6 @@ async def unpublish_game(game_id: str, current_user: dict = Depends(get_current_
     
     # 从已发布中删除
     published = [g for g in published if g['id'] != game_id]
-    save_games(user_folder, 'published', published)
     
     # 更新状态
     game['status'] = 'draft'
@@ -471,7 +837,7 @@ async def unpublish_game(game_id: str, current_user: dict = Depends(get_current_
         if g['id'] == game_id:
             drafts[i] = game
             break
-    save_games(user_folder, 'drafts', drafts)
+    save_user_games(user_folder, drafts=drafts, published=published)
     
     return {
         "success": True,
@@ -510,14 +876,11 @@ async def delete_game(game_id: str, current_user: dict = Depends(get_current_use
                 if thumb_path.exists():
                     thumb_path.unlink()
                 
-                # 从列表中删除
+                # 从草稿和已发布中删除
                 drafts = [g for g in drafts if g['id'] != game_id]
-                save_games(user_folder, 'drafts', drafts)
-                
-                # 同时从已发布中删除
                 published = load_games(user_folder, 'published')
                 published = [g for g in published if g['id'] != game_id]
-                save_games(user_folder, 'published', published)
+                save_user_games(user_folder, drafts=drafts, published=published)
                 
                 return {
                     "success": True,
@@ -558,14 +921,11 @@ async def delete_game(game_id: str, current_user: dict = Depends(get_current_use
     if thumb_path.exists():
         thumb_path.unlink()
     
-    # 从列表中删除
+    # 从草稿和已发布中删除
     drafts = [g for g in drafts if g['id'] != game_id]
-    save_games(user_folder, 'drafts', drafts)
-    
-    # 同时从已发布中删除
     published = load_games(user_folder, 'published')
     published = [g for g in published if g['id'] != game_id]
-    save_games(user_folder, 'published', published)
+    save_user_games(user_folder, drafts=drafts, published=published)
     
     return {
         "success": True,
@@ -2,68 +2,60 @@
 搜索路由 - 搜索已发布的游戏
 """
 from fastapi import APIRouter, Query
-from typing import List, Dict, Any
-import json
-from pathlib import Path
 
-router = APIRouter()
+from backend.utils import fast_json, single_flight
+from backend.services import search_index, suggest_index
 
-# 数据目录
-DATA_DIR = Path(__file__).parent.parent.parent / "data"
-USERS_DIR = DATA_DIR / "users"
+router = APIRouter()
 
 
 @router.get("/search")
-async def search_games(q: str = Query(..., min_length=1)):
+async def search_games(
+    q: str = Query(..., min_length=1),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    sort: str = Query("relevance", pattern="^(relevance|time)$")
+):
     """
     全局搜索 - 搜索所有已发布的游戏
     :param q: 搜索关键词
+    :param offset: 跳过的结果数
+    :param limit: 每页数量（最多100）
+    :param sort: relevance 按相关度（标题 > 作者 > 简介），time 按发布时间倒序
     """
-    keyword = q.lower()
-    results = []
+    # 首次搜索时加载索引（并发请求只加载一次）
+    if not search_index.is_loaded():
+        await single_flight.run("search:index", search_index.ensure_loaded)
     
-    if not USERS_DIR.exists():
-        return {
-            'games': [],
-            'total': 0
-        }
+    # 倒排索引查询 + BM25 打分，只取出当前页
+    total, games = search_index.search(q, offset=offset, limit=limit, sort=sort)
     
-    # 遍历所有用户文件夹
-    for user_dir in USERS_DIR.iterdir():
-        if not user_dir.is_dir():
-            continue
-        
-        # 读取该用户的已发布游戏
-        published_file = user_dir / "published" / "game.json"
-        if not published_file.exists():
-            continue
-        
-        try:
-            with open(published_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                games = data.get('posts', [])
-                
-                # 搜索游戏
-                for game in games:
-                    if game.get('status') != 'published':
-                        continue
-                    
-                    title = (game.get('title') or '').lower()
-                    content = (game.get('content') or '').lower()
-                    author = (game.get('author_name') or '').lower()
-                    
-                    # 匹配标题、介绍或作者
-                    if keyword in title or keyword in content or keyword in author:
-                        results.append(game)
-        
-        except Exception as e:
-            print(f"搜索用户 {user_dir.name} 的游戏失败: {e}")
-            continue
-    
-    # 按发布时间倒序
-    results.sort(key=lambda x: x.get('published_at', ''), reverse=True)
+    return fast_json.collection_response(
+        'games',
+        games,
+        tail=lambda count: {
+            'total': total,
+            'offset': offset,
+            'limit': limit,
+            'has_more': offset + count < total
+        }
+    )
+
+
+@router.get("/search/suggest")
+async def suggest_games(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(8, ge=1, le=20)
+):
+    """
+    搜索框自动补全 - 按前缀匹配游戏标题和作者名
+    :param q: 已输入的前缀
+    :param limit: 返回的建议数（最多20）
+    """
+    # 首次调用时构建补全索引（依赖搜索索引，并发请求只构建一次）
+    if not suggest_index.is_loaded():
+        await single_flight.run("search:suggest", suggest_index.ensure_loaded)
     
     return {
-        'games': results,
-        'total': len(results)
+        'suggestions': suggest_index.suggest(q, limit)
     }
@@ -0,0 +1,215 @@
+"""
+书籍全文检索
+- 对 book/ 下每个 txt 文件构建后缀数组（NumPy 倍增排序）
+- 按文件内容哈希缓存到 data/cache/book/，内容不变时直接加载
+- 查询为后缀数组上的二分查找，返回匹配段落及行号，不再扫描全文
+"""
+import hashlib
+import threading
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+BOOK_DIR = ROOT_DIR / "book"
+CACHE_DIR = ROOT_DIR / "data" / "cache" / "book"
+
+# 段落中匹配位置前后保留的字符数
+PASSAGE_CONTEXT = 60
+
+# 文件名 -> {"signature", "text", "search_text", "sa", "line_starts"}
+_books: Dict[str, dict] = {}
+_lock = threading.Lock()
+
+
+def build_suffix_array(codes: np.ndarray) -> np.ndarray:
+    """
+    倍增法构建后缀数组
+    每轮按 (rank[i], rank[i + k]) 排序，O(n log² n)，排序由 NumPy 完成
+    """
+    n = len(codes)
+    if n == 0:
+        return np.zeros(0, dtype=np.int32)
+
+    rank = np.unique(codes, return_inverse=True)[1].astype(np.int64)
+    k = 1
+    while True:
+        # 超出末尾的后缀第二关键字为 -1，保证较短的后缀排在前面
+        second = np.full(n, -1, dtype=np.int64)
+        second[:n - k] = rank[k:]
+        sa = np.lexsort((second, rank))
+
+        sorted_rank = rank[sa]
+        sorted_second = second[sa]
+        boundary = np.empty(n, dtype=bool)
+        boundary[0] = True
+        boundary[1:] = (sorted_rank[1:] != sorted_rank[:-1]) | (sorted_second[1:] != sorted_second[:-1])
+
+        rank = np.empty(n, dtype=np.int64)
+        rank[sa] = np.cumsum(boundary) - 1
+        if rank[sa[-1]] == n - 1 or k >= n:
+            return sa.astype(np.int32)
+        k *= 2
+
+
+def _normalize_text(text: str) -> str:
+    """检索用文本：小写（长度变化时保持原文，保证偏移一致）"""
+    lowered = text.lower()
+    return lowered if len(lowered) == len(text) else text
+
+
+def _load_book(path: Path) -> dict:
+    """加载书籍及其后缀数组（按内容哈希读取或构建缓存）"""
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    text = raw.decode('utf-8', errors='replace')
+    search_text = _normalize_text(text)
+
+    cache_file = CACHE_DIR / f"{digest}.sa.npy"
+    sa = None
+    if cache_file.exists():
+        try:
+            sa = np.load(cache_file)
+            if len(sa) != len(text):
+                sa = None
+        except Exception as e:
+            print(f"读取后缀数组缓存失败，将重建: {e}")
+            sa = None
+
+    if sa is None:
+        codes = np.frombuffer(search_text.encode('utf-32-le'), dtype=np.uint32)
+        sa = build_suffix_array(codes)
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(".tmp.npy")
+        np.save(tmp_file, sa)
+        tmp_file.replace(cache_file)
+
+    line_starts = [0]
+    pos = text.find("\n")
+    while pos != -1:
+        line_starts.append(pos + 1)
+        pos = text.find("\n", pos + 1)
+
+    stat = path.stat()
+    return {
+        "signature": (stat.st_mtime, stat.st_size),
+        "text": text,
+        "search_text": search_text,
+        "sa": sa,
+        "line_starts": line_starts
+    }
+
+
+def load_books() -> Dict[str, dict]:
+    """
+    加载所有书籍索引（文件变化时重新加载该文件）
+    构建新的字典后整体替换引用，检索中的请求继续使用旧字典
+    """
+    global _books
+    if not BOOK_DIR.exists():
+        return {}
+
+    with _lock:
+        current = {}
+        for path in sorted(BOOK_DIR.glob("*.txt")):
+            stat = path.stat()
+            book = _books.get(path.name)
+            if book is None or book["signature"] != (stat.st_mtime, stat.st_size):
+                try:
+                    book = _load_book(path)
+                except Exception as e:
+                    print(f"索引书籍 {path.name} 失败: {e}")
+                    continue
+            current[path.name] = book
+
+        _books = current
+        return current
+
+
+def is_current(books: Optional[Dict[str, dict]] = None) -> bool:
+    """已加载的索引（默认为当前索引）是否与磁盘上的书籍一致"""
+    if books is None:
+        books = _books
+    if not BOOK_DIR.exists():
+        return not books
+    paths = sorted(BOOK_DIR.glob("*.txt"))
+    if len(paths) != len(books):
+        return False
+    for path in paths:
+        book = books.get(path.name)
+        stat = path.stat()
+        if book is None or book["signature"] != (stat.st_mtime, stat.st_size):
+            return False
+    return True
+
+
+def _match_range(book: dict, pattern: str) -> Tuple[int, int]:
+    """后缀数组中以 pattern 开头的后缀区间 [lo, hi)"""
+    text = book["search_text"]
+    sa = book["sa"]
+    m = len(pattern)
+    key = lambda i: text[i:i + m]
+    lo = bisect_left(sa, pattern, key=key)
+    hi = bisect_right(sa, pattern, lo=lo, key=key)
+    return lo, hi
+
+
+def _passage(book: dict, offset: int, length: int) -> Tuple[int, str]:
+    """匹配位置所在行号（从1开始）及截取的段落"""
+    line_starts = book["line_starts"]
+    line_index = bisect_right(line_starts, offset) - 1
+    start = line_starts[line_index]
+    end = line_starts[line_index + 1] - 1 if line_index + 1 < len(line_starts) else len(book["text"])
+
+    left = max(start, offset - PASSAGE_CONTEXT)
+    right = min(end, offset + length + PASSAGE_CONTEXT)
+    passage = book["text"][left:right].strip()
+    if left > start:
+        passage = "…" + passage
+    if right < end:
+        passage = passage + "…"
+    return line_index + 1, passage
+
+
+def search(query: str, offset: int = 0, limit: int = 20) -> Tuple[int, List[dict]]:
+    """
+    在所有书籍中检索
+
+    Returns:
+        (匹配总数, 当前页的匹配段落)，按文件名、出现位置排序
+    """
+    pattern = _normalize_text(query.strip())
+    if not pattern:
+        return 0, []
+
+    # 取本地引用，加载新索引时替换的是模块变量，不影响本次遍历
+    books = _books
+    if not is_current(books):
+        books = load_books()
+
+    total = 0
+    results = []
+    for name, book in books.items():
+        lo, hi = _match_range(book, pattern)
+        count = hi - lo
+        if count == 0:
+            continue
+
+        # 只排序并截取当前页落在本文件中的部分
+        skip = max(0, offset - total)
+        take = offset + limit - total - skip
+        if take > 0 and skip < count:
+            positions = np.sort(book["sa"][lo:hi])[skip:skip + take]
+            for pos in positions:
+                line, passage = _passage(book, int(pos), len(pattern))
+                results.append({
+                    "file": Path(name).stem.strip(),
+                    "line": line,
+                    "offset": int(pos),
+                    "passage": passage
+                })
+        total += count
+
+    return total, results
@@ -0,0 +1,183 @@
+"""
+书籍分段读取
+- 每本书建立一次非空行的字节偏移索引，按文件内容哈希缓存到 data/cache/book/
+- 书籍内容通过 mmap 读取，不再每次请求重新打开并逐行扫描
+- 任意 offset/limit 窗口的读取耗时只与窗口大小有关
+"""
+import hashlib
+import mmap
+import threading
+from bisect import bisect_right
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+BOOK_DIR = ROOT_DIR / "book"
+CACHE_DIR = ROOT_DIR / "data" / "cache" / "book"
+
+# 已加载的书籍：[{"name", "signature", "mm", "lines"}]，lines 为 (行数, 2) 的字节区间
+_books: List[dict] = []
+
+# 每本书第一行在整个语料中的行号（最后一项为总行数）
+_line_starts: List[int] = [0]
+
+# 书籍版本号：每次重新加载后加一，用于失效响应缓存
+_generation = 0
+
+_lock = threading.Lock()
+
+
+def _signature(path: Path) -> Tuple[float, int]:
+    stat = path.stat()
+    return stat.st_mtime, stat.st_size
+
+
+def build_line_index(data) -> np.ndarray:
+    """
+    计算所有非空行（去除首尾空白后）的字节区间
+
+    Returns:
+        形状为 (行数, 2) 的 int64 数组，每行为 [start, end)
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    breaks = np.flatnonzero(raw == 10)
+    starts = np.concatenate(([0], breaks + 1))
+    ends = np.concatenate((breaks, [len(raw)]))
+
+    spans = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        line = bytes(data[start:end]).decode('utf-8', errors='replace')
+        stripped = line.strip()
+        if not stripped:
+            continue
+        lead = len(line) - len(line.lstrip())
+        begin = start + len(line[:lead].encode('utf-8'))
+        spans.append((begin, begin + len(stripped.encode('utf-8'))))
+
+    return np.array(spans, dtype=np.int64).reshape(-1, 2)
+
+
+def _open_book(path: Path) -> Optional[dict]:
+    """以 mmap 打开书籍，读取或构建行偏移索引"""
+    signature = _signature(path)
+    if signature[1] == 0:
+        return None
+
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    digest = hashlib.sha256(mm).hexdigest()
+    index_file = CACHE_DIR / f"{digest}.lines.npy"
+
+    lines = None
+    if index_file.exists():
+        try:
+            lines = np.load(index_file)
+        except Exception as e:
+            print(f"读取行偏移索引失败，将重建: {e}")
+
+    if lines is None:
+        lines = build_line_index(mm)
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = index_file.with_suffix(".tmp.npy")
+        np.save(tmp_file, lines)
+        tmp_file.replace(index_file)
+
+    return {
+        "name": path.name,
+        "signature": signature,
+        "mm": mm,
+        "lines": lines
+    }
+
+
+def _book_paths() -> List[Path]:
+    if not BOOK_DIR.exists():
+        return []
+    return sorted(BOOK_DIR.glob("*.txt"))
+
+
+def is_current() -> bool:
+    """已加载的书籍是否与磁盘一致"""
+    paths = [p for p in _book_paths() if p.stat().st_size > 0]
+    if len(paths) != len(_books):
+        return False
+    return all(
+        book["name"] == path.name and book["signature"] == _signature(path)
+        for book, path in zip(_books, paths)
+    )
+
+
+def generation() -> int:
+    """当前书籍版本号"""
+    return _generation
+
+
+def load_books():
+    """加载（或重新加载发生变化的）书籍，被替换或删除的书籍关闭其 mmap"""
+    global _books, _line_starts, _generation
+
+    with _lock:
+        loaded = {book["name"]: book for book in _books}
+        books = []
+        for path in _book_paths():
+            book = loaded.get(path.name)
+            if book is None or book["signature"] != _signature(path):
+                try:
+                    book = _open_book(path)
+                except Exception as e:
+                    print(f"读取文件 {path} 失败: {e}")
+                    continue
+            if book is not None:
+                books.append(book)
+
+        line_starts = [0]
+        for book in books:
+            line_starts.append(line_starts[-1] + len(book["lines"]))
+
+        _books = books
+        _line_starts = line_starts
+        _generation += 1
+
+        kept = {id(book) for book in books}
+        for book in loaded.values():
+            if id(book) not in kept:
+                book["mm"].close()
+
+
+def total_lines() -> int:
+    """语料中的非空行总数"""
+    return _line_starts[-1]
+
+
+def read_lines(offset: int, limit: int) -> List[str]:
+    """
+    读取语料中第 offset 行起的 limit 个非空行（跨文件连续）
+    """
+    try:
+        return _read_lines(_books, _line_starts, offset, limit)
+    except ValueError:
+        # 读取期间书籍被重新加载，旧的 mmap 已关闭，按新书籍重读一次
+        return _read_lines(_books, _line_starts, offset, limit)
+
+
+def _read_lines(books: List[dict], line_starts: List[int], offset: int, limit: int) -> List[str]:
+    result = []
+    position = offset
+    end = min(offset + limit, line_starts[-1])
+
+    while position < end:
+        book_index = bisect_right(line_starts, position) - 1
+        book = books[book_index]
+        local_start = position - line_starts[book_index]
+        local_end = min(end, line_starts[book_index + 1]) - line_starts[book_index]
+
+        mm = book["mm"]
+        for start, stop in book["lines"][local_start:local_end].tolist():
+            result.append(mm[start:stop].decode('utf-8', errors='replace'))
+
+        position = line_starts[book_index] + local_end
+
+    return result
@@ -0,0 +1,381 @@
+"""
+聊天消息存储
+- 消息保存在固定容量的内存环形缓冲区中，容量可在 config.json 的 chat_capacity 中配置
+- 每次变更（新消息、删除、清空）分配递增序号
+- 持久化为 messages.json 快照 + messages.log 追加日志，发送消息只追加一行
+- 日志行数超过容量时压缩：重写快照并清空日志
+- 超出容量的旧消息在压缩时按日期归档到 gzip 分段文件，分段索引记录序号和时间范围，
+  历史分页只读取需要的分段
+"""
+import gzip
+import json
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from backend.utils import fast_json
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+CHAT_DIR = DATA_DIR / "chat"
+SNAPSHOT_FILE = CHAT_DIR / "messages.json"
+LOG_FILE = CHAT_DIR / "messages.log"
+ARCHIVE_DIR = CHAT_DIR / "archive"
+ARCHIVE_INDEX_FILE = ARCHIVE_DIR / "index.json"
+CONFIG_PATH = Path(__file__).parent.parent.parent / "config.json"
+
+# 默认保留的消息数
+DEFAULT_CAPACITY = 200
+
+# 单个归档分段的最大消息数，超出后同一天开始新分段
+SEGMENT_MESSAGES = 2000
+
+# 保留的删除记录数，早于最旧记录的 since 返回完整列表
+TOMBSTONE_LIMIT = 500
+
+# 内存中的消息（超出容量时自动丢弃最旧的）
+_messages: Optional[Deque[Dict[str, Any]]] = None
+
+# 最新变更序号
+_seq = 0
+
+# 删除记录 (序号, 消息 id)
+_tombstones: Deque[Tuple[int, str]] = deque(maxlen=TOMBSTONE_LIMIT)
+
+# 小于该序号的 since 无法计算增量（服务重启、清空、删除记录被淘汰）
+_delta_floor = 0
+
+# 快照之后追加的日志行数
+_log_entries = 0
+
+# 已移出缓冲区、等待下次压缩时归档的消息
+_evicted: List[Dict[str, Any]] = []
+
+# 归档分段索引：[{"file", "first_seq", "last_seq", "first_time", "last_time", "count"}]，按序号升序
+_segments: Optional[List[Dict[str, Any]]] = None
+
+_lock = threading.Lock()
+
+# 归档文件的读写锁（读取历史时不阻塞消息存储）
+_archive_lock = threading.Lock()
+
+
+def capacity() -> int:
+    """消息容量"""
+    try:
+        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+            return max(1, int(json.load(f).get('chat_capacity', DEFAULT_CAPACITY)))
+    except Exception:
+        return DEFAULT_CAPACITY
+
+
+def _apply(entry: Dict[str, Any]):
+    """在内存中应用一条日志（调用方持有锁）"""
+    op = entry.get('op')
+    if op == 'post':
+        if len(_messages) == _messages.maxlen:
+            _evicted.append(_messages[0])
+        _messages.append(entry['message'])
+    elif op == 'delete':
+        for msg in _messages:
+            if msg.get('id') == entry['id']:
+                _messages.remove(msg)
+                break
+    elif op == 'clear':
+        _messages.clear()
+        _evicted.clear()
+
+
+def _load():
+    """读取快照并重放日志（调用方持有锁）"""
+    global _messages, _seq, _delta_floor, _log_entries
+
+    messages = []
+    seq = 0
+    if SNAPSHOT_FILE.exists():
+        with open(SNAPSHOT_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        messages = data.get('messages', [])
+        seq = data.get('seq', 0)
+
+    # 旧版本快照中的消息没有序号
+    for msg in messages:
+        if 'seq' not in msg:
+            seq += 1
+            msg['seq'] = seq
+        seq = max(seq, msg['seq'])
+
+    limit = capacity()
+    _messages = deque(messages[-limit:], maxlen=limit)
+    # 容量调小时多出的消息归档
+    _evicted[:] = messages[:-limit]
+    _log_entries = 0
+
+    if LOG_FILE.exists():
+        with open(LOG_FILE, 'rb') as f:
+            for line in f:
+                try:
+                    entry = fast_json.loads(line)
+                except ValueError:
+                    # 写入中断的最后一行
+                    continue
+                _log_entries += 1
+                # 压缩中断时快照已包含的日志
+                if entry['seq'] <= seq:
+                    continue
+                _apply(entry)
+                seq = entry['seq']
+
+    _seq = seq
+    # 重启前的删除记录已丢失，之前的游标都需要完整刷新
+    _delta_floor = seq
+
+
+def _ensure_loaded():
+    """首次访问时加载（调用方持有锁）"""
+    if _messages is None:
+        _load()
+
+
+def _compact():
+    """归档移出的消息，重写快照并清空日志（调用方持有锁）"""
+    global _log_entries
+    CHAT_DIR.mkdir(parents=True, exist_ok=True)
+
+    if _evicted:
+        _archive(_evicted)
+        _evicted.clear()
+
+    tmp_file = SNAPSHOT_FILE.with_suffix(".json.tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'messages': list(_messages), 'seq': _seq}, f, ensure_ascii=False)
+    tmp_file.replace(SNAPSHOT_FILE)
+
+    with open(LOG_FILE, 'wb'):
+        pass
+    _log_entries = 0
+
+
+def _append_log(entry: Dict[str, Any]):
+    """追加一行日志，超过容量时压缩（调用方持有锁）"""
+    global _log_entries
+    CHAT_DIR.mkdir(parents=True, exist_ok=True)
+    with open(LOG_FILE, 'ab') as f:
+        f.write(fast_json.dumps(entry) + b"\n")
+    _log_entries += 1
+
+    if _log_entries >= _messages.maxlen:
+        _compact()
+
+
+# === 历史归档 ===
+
+def _load_segments() -> List[Dict[str, Any]]:
+    """读取归档分段索引（调用方持有归档锁）"""
+    global _segments
+    if _segments is None:
+        _segments = []
+        if ARCHIVE_INDEX_FILE.exists():
+            try:
+                with open(ARCHIVE_INDEX_FILE, 'r', encoding='utf-8') as f:
+                    _segments = json.load(f).get('segments', [])
+            except Exception as e:
+                print(f"读取聊天归档索引失败: {e}")
+    return _segments
+
+
+def _save_segments():
+    """写入归档分段索引（调用方持有归档锁）"""
+    tmp_file = ARCHIVE_INDEX_FILE.with_suffix(".json.tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'segments': _segments}, f, ensure_ascii=False, indent=2)
+    tmp_file.replace(ARCHIVE_INDEX_FILE)
+
+
+def _archive(messages: List[Dict[str, Any]]):
+    """
+    按日期把消息追加到归档分段
+    每批消息作为一个 gzip 成员追加，不重写已有内容
+    """
+    with _archive_lock:
+        segments = _load_segments()
+        last_seq = segments[-1]['last_seq'] if segments else 0
+
+        # 压缩中断后重放日志时，跳过已经归档的消息
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for msg in messages:
+            if msg['seq'] > last_seq:
+                groups.setdefault(msg.get('timestamp', '')[:10] or "undated", []).append(msg)
+        if not groups:
+            return
+
+        ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+        for day, batch in groups.items():
+            while batch:
+                segment = segments[-1] if segments else None
+                if segment is None or not segment['file'].startswith(day) or segment['count'] >= SEGMENT_MESSAGES:
+                    part = sum(1 for seg in segments if seg['file'].startswith(day))
+                    name = f"{day}.jsonl.gz" if part == 0 else f"{day}-{part}.jsonl.gz"
+                    segment = {
+                        "file": name,
+                        "first_seq": batch[0]['seq'],
+                        "last_seq": batch[0]['seq'],
+                        "first_time": batch[0].get('timestamp'),
+                        "last_time": batch[0].get('timestamp'),
+                        "count": 0
+                    }
+                    segments.append(segment)
+
+                chunk = batch[:SEGMENT_MESSAGES - segment['count']]
+                batch = batch[len(chunk):]
+                with gzip.open(ARCHIVE_DIR / segment['file'], 'ab') as f:
+                    f.write(b"".join(fast_json.dumps(msg) + b"\n" for msg in chunk))
+
+                segment['last_seq'] = chunk[-1]['seq']
+                segment['last_time'] = chunk[-1].get('timestamp')
+                segment['count'] += len(chunk)
+
+        _save_segments()
+
+
+def _read_segment(segment: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """读取一个归档分段的所有消息（调用方持有归档锁）"""
+    with gzip.open(ARCHIVE_DIR / segment['file'], 'rb') as f:
+        return [fast_json.loads(line) for line in f if line.strip()]
+
+
+def _clear_archive():
+    """删除所有归档"""
+    global _segments
+    with _archive_lock:
+        for segment in _load_segments():
+            (ARCHIVE_DIR / segment['file']).unlink(missing_ok=True)
+        _segments = []
+        if ARCHIVE_DIR.exists():
+            _save_segments()
+
+
+def history(before: int, limit: int = 50) -> Dict[str, Any]:
+    """
+    序号小于 before 的最近 limit 条消息（包括已归档的消息）
+
+    Returns:
+        {"messages": 按序号升序, "has_more", "next_before": 继续向前翻页的游标}
+    """
+    with _lock:
+        _ensure_loaded()
+        # 缓冲区与待归档消息都比已归档的消息新
+        recent_messages = list(_evicted) + list(_messages)
+
+    result = [msg for msg in recent_messages if msg['seq'] < before][-limit:]
+
+    with _archive_lock:
+        segments = [seg for seg in _load_segments() if seg['first_seq'] < before]
+        # 从最新的分段向前读取，只读取填满本页所需的分段
+        for segment in reversed(segments):
+            if len(result) >= limit:
+                break
+            # 读取期间可能有待归档消息刚写入归档，按已取到的最旧序号去重
+            bound = result[0]['seq'] if result else before
+            older = [msg for msg in _read_segment(segment) if msg['seq'] < bound]
+            if older:
+                result = older[-(limit - len(result)):] + result
+
+        oldest = result[0]['seq'] if result else before
+        has_more = (
+            any(seg['first_seq'] < oldest for seg in segments)
+            or any(msg['seq'] < oldest for msg in recent_messages)
+        )
+
+    return {
+        "messages": result,
+        "has_more": has_more,
+        "next_before": result[0]['seq'] if result else None
+    }
+
+
+def current_seq() -> int:
+    """最新变更序号"""
+    with _lock:
+        _ensure_loaded()
+        return _seq
+
+
+def recent(limit: int = 0) -> List[Dict[str, Any]]:
+    """最近 limit 条消息（limit <= 0 时返回全部）"""
+    with _lock:
+        _ensure_loaded()
+        messages = list(_messages)
+    return messages[-limit:] if limit > 0 else messages
+
+
+def append(message: Dict[str, Any]) -> Dict[str, Any]:
+    """追加新消息，分配序号后返回"""
+    global _seq
+    with _lock:
+        _ensure_loaded()
+        _seq += 1
+        message = {**message, "seq": _seq}
+        _apply({"op": "post", "message": message})
+        _append_log({"op": "post", "seq": _seq, "message": message})
+        return message
+
+
+def delete(message_id: str) -> Optional[int]:
+    """
+    删除消息
+
+    Returns:
+        删除的序号；消息不存在时返回 None
+    """
+    global _seq, _delta_floor
+    with _lock:
+        _ensure_loaded()
+        if not any(msg.get('id') == message_id for msg in _messages):
+            return None
+
+        _seq += 1
+        _apply({"op": "delete", "id": message_id})
+        if len(_tombstones) == _tombstones.maxlen:
+            _delta_floor = _tombstones[0][0]
+        _tombstones.append((_seq, message_id))
+        _append_log({"op": "delete", "seq": _seq, "id": message_id})
+        return _seq
+
+
+def clear() -> int:
+    """清空所有消息，之前的游标都需要完整刷新"""
+    global _seq, _delta_floor
+    with _lock:
+        _ensure_loaded()
+        _seq += 1
+        _messages.clear()
+        _evicted.clear()
+        _tombstones.clear()
+        _delta_floor = _seq
+        _compact()
+        _clear_archive()
+        return _seq
+
+
+def messages_since(since: int) -> Optional[Dict[str, Any]]:
+    """
+    计算 since 之后的增量
+
+    Returns:
+        {"messages", "deleted"}；游标过旧或未知时返回 None，调用方应返回完整列表
+    """
+    with _lock:
+        _ensure_loaded()
+        if since < _delta_floor or since > _seq:
+            return None
+
+        messages = []
+        for msg in reversed(_messages):
+            if msg['seq'] <= since:
+                break
+            messages.append(msg)
+        messages.reverse()
+
+        deleted = [message_id for seq, message_id in _tombstones if seq > since]
+        return {"messages": messages, "deleted": deleted}
@@ -0,0 +1,279 @@
+"""
+草稿 / 发布两态的内容集合（通告、公告等）
+- 首次访问时加载 drafts / published 两个 JSON 文件，之后所有读取都来自内存
+- 维护 id 索引、按发布时间和创建时间排序的视图，写操作增量更新视图并写回文件
+- 每条内容预先生成列表摘要（纯文本节选），列表按发布时间游标分页
+- 文件格式与原先一致：{"posts": [...]}
+"""
+import json
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from backend.utils.cursor import decode_cursor, encode_cursor
+from backend.utils.id_generator import new_id
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+SYSTEM_DIR = DATA_DIR / "system"
+
+# 列表摘要中正文节选的最大字符数
+EXCERPT_LENGTH = 100
+
+
+def make_excerpt(content: str) -> str:
+    """正文的纯文本节选（合并空白）"""
+    text = " ".join((content or "").split())
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    return text[:EXCERPT_LENGTH] + "..."
+
+
+def _remove_key(keys: List[Tuple[str, str]], key: Tuple[str, str]):
+    """从有序键列表中删除一项"""
+    i = bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        del keys[i]
+
+
+class ContentCollection:
+    """
+    一种内容类型的存储
+
+    Args:
+        name: 文件名前缀，对应 data/system/<name>_drafts.json 和 <name>_published.json
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.drafts_file = SYSTEM_DIR / f"{name}_drafts.json"
+        self.published_file = SYSTEM_DIR / f"{name}_published.json"
+
+        # 每次修改递增，用于缓存校验
+        self.version = 0
+
+        # id -> 内容（草稿和已发布的都在这里）
+        self._posts: Dict[str, dict] = {}
+
+        # 已发布的 id -> 内容
+        self._published: Dict[str, dict] = {}
+
+        # id -> 列表摘要（不含正文）
+        self._summaries: Dict[str, dict] = {}
+
+        # 有序视图：id（即创建顺序）和 (published_at, id)，均为升序
+        self._created_keys: List[str] = []
+        self._published_keys: List[Tuple[str, str]] = []
+
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    # === 加载与保存 ===
+
+    @staticmethod
+    def _read(path: Path) -> List[dict]:
+        if not path.exists():
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('posts', [])
+
+    @staticmethod
+    def _write(path: Path, posts: List[dict]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'posts': posts}, f, ensure_ascii=False, indent=2)
+
+    def _ensure_loaded(self):
+        """首次访问时加载文件（调用方持有锁）"""
+        if self._loaded:
+            return
+
+        for post in self._read(self.drafts_file):
+            self._posts[post['id']] = post
+        for post in self._read(self.published_file):
+            # 草稿文件中的记录优先（两者为同一内容）
+            post = self._posts.setdefault(post['id'], post)
+            self._published[post['id']] = post
+
+        for post_id, post in self._posts.items():
+            post['status'] = 'published' if post_id in self._published else 'draft'
+            self._summarize(post)
+            self._created_keys.append(post_id)
+        for post_id, post in self._published.items():
+            self._published_keys.append((post.get('published_at') or '', post_id))
+        self._created_keys.sort()
+        self._published_keys.sort()
+
+        self._loaded = True
+
+    def _save(self, drafts: bool = True, published: bool = True):
+        """写回文件（调用方持有锁）"""
+        if drafts:
+            self._write(self.drafts_file, list(self._posts.values()))
+        if published:
+            self._write(self.published_file, list(self._published.values()))
+        self.version += 1
+
+    def _summarize(self, post: dict):
+        """生成列表摘要（调用方持有锁）"""
+        self._summaries[post['id']] = {
+            "id": post['id'],
+            "title": post.get('title'),
+            "excerpt": make_excerpt(post.get('content')),
+            "created_at": post.get('created_at'),
+            "published_at": post.get('published_at')
+        }
+
+    def _withdraw(self, post: dict) -> bool:
+        """从已发布中移除（调用方持有锁），返回是否原本已发布"""
+        if self._published.pop(post['id'], None) is None:
+            return False
+        _remove_key(self._published_keys, (post.get('published_at') or '', post['id']))
+        return True
+
+    # === 读取 ===
+
+    def get_published(self, post_id: str) -> Optional[dict]:
+        """按 id 查找已发布的内容"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._published.get(post_id)
+
+    def published_page(self, cursor: Optional[str] = None, limit: int = 20,
+                       summary: bool = True) -> Tuple[List[dict], Optional[str]]:
+        """
+        按发布时间倒序分页
+
+        Args:
+            cursor: 上一页返回的游标，None 表示第一页
+            limit: 每页数量
+            summary: True 时返回摘要（不含正文），否则返回完整内容
+
+        Returns:
+            (当前页, 下一页游标)；没有更多时游标为 None
+        """
+        key = decode_cursor(cursor) if cursor else None
+        with self._lock:
+            self._ensure_loaded()
+            keys = self._published_keys
+            end = len(keys) if key is None else bisect_left(keys, key)
+            start = max(0, end - limit)
+            source = self._summaries if summary else self._published
+            items = [source[post_id] for _, post_id in reversed(keys[start:end])]
+            next_cursor = encode_cursor(keys[start]) if start > 0 else None
+            return items, next_cursor
+
+    def latest(self) -> Optional[dict]:
+        """最新发布的内容"""
+        with self._lock:
+            self._ensure_loaded()
+            if not self._published_keys:
+                return None
+            return self._published[self._published_keys[-1][1]]
+
+    def iter_posts(self, batch: int = 100) -> Iterator[dict]:
+        """逐条返回所有内容，按创建时间（即 id）倒序；每次只在锁内取出一批（用于流式输出）"""
+        last_id = None
+        while True:
+            with self._lock:
+                self._ensure_loaded()
+                keys = self._created_keys
+                end = len(keys) if last_id is None else bisect_left(keys, last_id)
+                start = max(0, end - batch)
+                posts = [self._posts[post_id] for post_id in reversed(keys[start:end])]
+            if not posts:
+                return
+            yield from posts
+            last_id = posts[-1]['id']
+
+    # === 写入 ===
+
+    def create(self, title: str, content: str) -> dict:
+        """创建草稿"""
+        now = datetime.now().isoformat()
+        post = {
+            "id": new_id(),
+            "title": title,
+            "content": content,
+            "status": "draft",
+            "created_at": now,
+            "updated_at": now,
+            "published_at": None
+        }
+        with self._lock:
+            self._ensure_loaded()
+            self._posts[post['id']] = post
+            self._summarize(post)
+            insort(self._created_keys, post['id'])
+            self._save(published=False)
+        return post
+
+    def update(self, post_id: str, title: Optional[str] = None, content: Optional[str] = None) -> Optional[dict]:
+        """修改内容，已发布的自动撤回到草稿；不存在时返回 None"""
+        with self._lock:
+            self._ensure_loaded()
+            post = self._posts.get(post_id)
+            if post is None:
+                return None
+
+            if title is not None:
+                post['title'] = title
+            if content is not None:
+                post['content'] = content
+            post['updated_at'] = datetime.now().isoformat()
+
+            self._withdraw(post)
+            post['status'] = 'draft'
+            post['published_at'] = None
+            self._summarize(post)
+            self._save()
+            return post
+
+    def publish(self, post_id: str) -> Optional[dict]:
+        """发布（重复发布时更新发布时间）；不存在时返回 None"""
+        with self._lock:
+            self._ensure_loaded()
+            post = self._posts.get(post_id)
+            if post is None:
+                return None
+
+            self._withdraw(post)
+            post['status'] = 'published'
+            post['published_at'] = datetime.now().isoformat()
+            self._published[post_id] = post
+            self._summarize(post)
+            insort(self._published_keys, (post['published_at'], post_id))
+            self._save()
+            return post
+
+    def unpublish(self, post_id: str) -> Optional[dict]:
+        """撤回到草稿；不存在时返回 None"""
+        with self._lock:
+            self._ensure_loaded()
+            post = self._posts.get(post_id)
+            if post is None:
+                return None
+
+            self._withdraw(post)
+            post['status'] = 'draft'
+            post['published_at'] = None
+            self._summarize(post)
+            self._save()
+            return post
+
+    def delete(self, post_id: str) -> bool:
+        """删除，返回是否存在"""
+        with self._lock:
+            self._ensure_loaded()
+            post = self._posts.pop(post_id, None)
+            if post is None:
+                return False
+
+            self._summaries.pop(post_id, None)
+            i = bisect_left(self._created_keys, post_id)
+            if i < len(self._created_keys) and self._created_keys[i] == post_id:
+                del self._created_keys[i]
+            self._withdraw(post)
+            self._save()
+            return True
@@ -0,0 +1,210 @@
+"""
+游戏热度统计（游玩次数、详情浏览次数）
+- 每次游玩或浏览只在内存中计数，请求路径上没有同步 I/O
+- 计数只在事件循环线程中递增（单写者，无需加锁）；后台线程定期复制计数快照，
+  与上次写盘时的快照相减得到增量，批量写入 data/system/game_stats.json
+- 热度分数：游玩和浏览按权重计分，按半衰期指数衰减；排行在每次写盘时重算
+- 游玩按游戏文件路径计数，写盘时再对应到已发布游戏，草稿预览不计入
+"""
+import atexit
+import json
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from backend.services import search_index
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+STATS_FILE = DATA_DIR / "system" / "game_stats.json"
+
+# 计数写盘的间隔（秒）
+FLUSH_INTERVAL = 30.0
+
+# 热度分数的半衰期（秒）
+HALF_LIFE = 7 * 24 * 3600
+
+# 每次游玩 / 浏览计入的热度分数
+PLAY_WEIGHT = 3.0
+VIEW_WEIGHT = 1.0
+
+# 进程启动以来的累计计数：游戏文件路径 -> 游玩次数，game_id -> 浏览次数
+_plays: Dict[str, int] = defaultdict(int)
+_views: Dict[str, int] = defaultdict(int)
+
+# 上次写盘时的计数快照
+_flushed_plays: Dict[str, int] = {}
+_flushed_views: Dict[str, int] = {}
+
+# game_id -> {"plays", "views", "score", "scored_at"}，score 为 scored_at 时刻的热度
+_stats: Optional[Dict[str, dict]] = None
+
+# 按写盘时热度降序的 game_id
+_ranking: List[str] = []
+
+_lock = threading.Lock()
+_flusher: Optional[threading.Thread] = None
+
+
+# === 计数（请求路径） ===
+
+def record_play(game_file: str):
+    """记录一次游玩（game_file 为游戏记录中的文件路径）"""
+    _plays[game_file] += 1
+    if _flusher is None:
+        _start_flusher()
+
+
+def record_view(game_id: str):
+    """记录一次详情浏览"""
+    _views[game_id] += 1
+    if _flusher is None:
+        _start_flusher()
+
+
+def _start_flusher():
+    """首次计数时启动后台写盘线程"""
+    global _flusher
+    with _lock:
+        if _flusher is not None:
+            return
+        _flusher = threading.Thread(target=_flush_loop, name="game-stats", daemon=True)
+        _flusher.start()
+    # 正常退出时写入最后一批计数
+    atexit.register(flush)
+
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        try:
+            flush()
+        except Exception as e:
+            print(f"写入游戏统计失败: {e}")
+
+
+# === 加载与保存 ===
+
+def _decayed(entry: dict, now: float) -> float:
+    """热度分数衰减到 now 时刻"""
+    return entry["score"] * 0.5 ** ((now - entry["scored_at"]) / HALF_LIFE)
+
+
+def _rank(now: float):
+    """按当前热度重排（调用方持有锁）"""
+    global _ranking
+    _ranking = sorted(_stats, key=lambda game_id: _decayed(_stats[game_id], now), reverse=True)
+
+
+def _ensure_loaded():
+    """首次访问时读取统计文件（调用方持有锁）"""
+    global _stats
+    if _stats is not None:
+        return
+    _stats = {}
+    if STATS_FILE.exists():
+        try:
+            with open(STATS_FILE, 'r', encoding='utf-8') as f:
+                _stats = json.load(f).get("games", {})
+        except Exception as e:
+            print(f"读取游戏统计失败: {e}")
+    _rank(time.time())
+
+
+def _save():
+    """写入统计文件（写临时文件后原子替换，调用方持有锁）"""
+    STATS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = STATS_FILE.with_suffix(".tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({"games": _stats}, f, ensure_ascii=False, separators=(",", ":"))
+    tmp_file.replace(STATS_FILE)
+
+
+def _deltas(counts: Dict[str, int], flushed: Dict[str, int]) -> Dict[str, int]:
+    """两次快照之间的增量"""
+    return {
+        key: count - flushed.get(key, 0)
+        for key, count in counts.items()
+        if count != flushed.get(key, 0)
+    }
+
+
+def _add(game_id: str, plays: int, views: int, now: float):
+    """累加一个游戏的计数和热度（调用方持有锁）"""
+    entry = _stats.get(game_id)
+    if entry is None:
+        entry = _stats[game_id] = {"plays": 0, "views": 0, "score": 0.0, "scored_at": now}
+    entry["plays"] += plays
+    entry["views"] += views
+    entry["score"] = _decayed(entry, now) + plays * PLAY_WEIGHT + views * VIEW_WEIGHT
+    entry["scored_at"] = now
+
+
+def flush() -> int:
+    """
+    把上次写盘以来的计数写入文件并重算排行
+
+    Returns:
+        计入统计的次数
+    """
+    global _flushed_plays, _flushed_views
+    with _lock:
+        # dict() 复制在持有 GIL 时完成，期间计数不会变化
+        plays = dict(_plays)
+        views = dict(_views)
+        play_deltas = _deltas(plays, _flushed_plays)
+        view_deltas = _deltas(views, _flushed_views)
+        if not play_deltas and not view_deltas:
+            return 0
+
+        _ensure_loaded()
+        now = time.time()
+        recorded = 0
+        for game_file, count in play_deltas.items():
+            game_id = search_index.game_for_file(game_file)
+            if game_id is not None:
+                _add(game_id, count, 0, now)
+                recorded += count
+        for game_id, count in view_deltas.items():
+            if search_index.get_doc(game_id) is not None:
+                _add(game_id, 0, count, now)
+                recorded += count
+
+        _flushed_plays = plays
+        _flushed_views = views
+        if recorded:
+            _save()
+            _rank(now)
+        return recorded
+
+
+# === 查询 ===
+
+def top(limit: int = 10) -> List[Tuple[dict, dict]]:
+    """
+    热度最高的已发布游戏（跳过已撤回或删除的）
+
+    Returns:
+        [(游戏记录, {"plays", "views", "popularity"})]
+    """
+    with _lock:
+        _ensure_loaded()
+        ranking = _ranking
+        stats = _stats
+
+    now = time.time()
+    result = []
+    for game_id in ranking:
+        game = search_index.get_doc(game_id)
+        if game is None:
+            continue
+        entry = stats[game_id]
+        result.append((game, {
+            "plays": entry["plays"],
+            "views": entry["views"],
+            "popularity": round(_decayed(entry, now), 2)
+        }))
+        if len(result) >= limit:
+            break
+    return result
@@ -0,0 +1,202 @@
+"""
+前端静态图片优化服务
+- 启动时将 frontend/images 下的图片转换为 WebP（GIF 转为动画 WebP）
+- 多进程并行转换，结果按源文件哈希缓存，源文件未变化时跳过
+- 请求时根据 Accept 头返回体积更小的格式
+"""
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, Tuple
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+IMAGES_DIR = ROOT_DIR / "frontend" / "images"
+CACHE_DIR = ROOT_DIR / "data" / "cache" / "images"
+MANIFEST_FILE = CACHE_DIR / "manifest.json"
+
+# 需要转换的源图片格式
+SOURCE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".bmp"}
+
+# WebP 质量（与原背景图转换保持一致）
+WEBP_QUALITY = 85
+
+# 内存中的清单缓存（按文件修改时间失效）
+_manifest: Dict[str, dict] = {}
+_manifest_mtime: Optional[float] = None
+
+
+def file_hash(path: Path) -> str:
+    """计算文件内容的 SHA256"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_manifest() -> Dict[str, dict]:
+    """加载转换清单（源文件名 -> 转换结果）"""
+    if not MANIFEST_FILE.exists():
+        return {}
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data.get('files', {})
+    except Exception as e:
+        print(f"读取图片清单失败: {e}")
+        return {}
+
+
+def save_manifest(files: Dict[str, dict]):
+    """保存转换清单"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'files': files}, f, ensure_ascii=False, indent=2)
+
+
+def _convert_to_webp(source: str, target: str) -> Tuple[str, Optional[str]]:
+    """
+    将单张图片转换为 WebP（在工作进程中执行）
+
+    Returns:
+        (源文件路径, 错误信息)，成功时错误信息为 None
+    """
+    from PIL import Image
+
+    try:
+        img = Image.open(source)
+
+        if getattr(img, 'is_animated', False):
+            # 动画 GIF -> 动画 WebP，保留帧时长和循环次数
+            img.save(
+                target,
+                'WEBP',
+                save_all=True,
+                quality=WEBP_QUALITY,
+                method=6,
+                duration=img.info.get('duration', 100),
+                loop=img.info.get('loop', 0)
+            )
+        else:
+            # 如果带透明度，保留 alpha 通道
+            if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+                img = img.convert('RGBA')
+            else:
+                img = img.convert('RGB')
+            img.save(target, 'WEBP', quality=WEBP_QUALITY, method=6)
+
+        return source, None
+    except Exception as e:
+        return source, str(e)
+
+
+def optimize_frontend_images(max_workers: Optional[int] = None) -> Dict[str, dict]:
+    """
+    转换 frontend/images 下的所有图片为 WebP
+
+    源文件哈希未变化且输出文件存在时跳过转换。
+
+    Returns:
+        Dict: 最新的转换清单
+    """
+    IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    old_manifest = load_manifest()
+    manifest = {}
+    pending = {}
+
+    for source in sorted(IMAGES_DIR.iterdir()):
+        if not source.is_file() or source.suffix.lower() not in SOURCE_EXTENSIONS:
+            continue
+
+        digest = file_hash(source)
+        entry = old_manifest.get(source.name)
+
+        # 源文件未变化，复用缓存
+        if entry and entry.get('hash') == digest and (CACHE_DIR / entry['webp']).exists():
+            manifest[source.name] = entry
+            continue
+
+        webp_name = f"{source.stem}.{digest[:16]}.webp"
+        manifest[source.name] = {
+            "hash": digest,
+            "webp": webp_name,
+            "size": source.stat().st_size,
+            "webp_size": None
+        }
+        pending[str(source)] = str(CACHE_DIR / webp_name)
+
+    if pending:
+        print(f"🔄 正在转换 {len(pending)} 张图片为 WebP 格式...")
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(_convert_to_webp, pending.keys(), pending.values())
+            for source, error in results:
+                name = Path(source).name
+                if error:
+                    print(f"❌ 转换失败 {name}: {error}")
+                    manifest.pop(name, None)
+                    continue
+                entry = manifest[name]
+                entry['webp_size'] = (CACHE_DIR / entry['webp']).stat().st_size
+                print(f"✅ {name}: {entry['size'] // 1024} KB -> {entry['webp_size'] // 1024} KB")
+    else:
+        print("✅ 图片均已是最新的 WebP 缓存")
+
+    # 清理不再被引用的旧输出
+    referenced = {entry['webp'] for entry in manifest.values()}
+    for cached in CACHE_DIR.glob("*.webp"):
+        if cached.name not in referenced:
+            cached.unlink()
+
+    save_manifest(manifest)
+    return manifest
+
+
+def get_manifest() -> Dict[str, dict]:
+    """获取转换清单（文件变化时自动重新加载）"""
+    global _manifest, _manifest_mtime
+
+    try:
+        mtime = MANIFEST_FILE.stat().st_mtime
+    except FileNotFoundError:
+        return {}
+
+    if mtime != _manifest_mtime:
+        _manifest = load_manifest()
+        _manifest_mtime = mtime
+    return _manifest
+
+
+def accepts_webp(accept: Optional[str]) -> bool:
+    """判断客户端 Accept 头是否接受 WebP"""
+    if not accept:
+        return False
+    for part in accept.split(','):
+        media, _, params = part.strip().partition(';')
+        if media.strip().lower() == 'image/webp':
+            # q=0 表示明确拒绝
+            return params.replace(' ', '').lower() not in ('q=0', 'q=0.0')
+    return False
+
+
+def resolve_image(filename: str, accept: Optional[str]) -> Optional[Path]:
+    """
+    根据 Accept 头选择要返回的图片文件
+
+    客户端接受 WebP 且 WebP 版本更小时返回缓存中的 WebP，否则返回原图。
+    文件不存在时返回 None。
+    """
+    source = IMAGES_DIR / filename
+    if not source.is_file():
+        return None
+
+    if accepts_webp(accept):
+        entry = get_manifest().get(filename)
+        if entry and entry.get('webp_size') and entry['webp_size'] < entry['size']:
+            webp_path = CACHE_DIR / entry['webp']
+            if webp_path.exists():
+                return webp_path
+
+    return source
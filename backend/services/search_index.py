@@ -0,0 +1,656 @@
+"""
+已发布游戏的全文倒排索引
+- 中文按字符切分（单字 + 二元组），拉丁文字按单词切分
+- 发布 / 撤回 / 编辑 / 删除时按用户增量更新
+- 持久化到 data/cache/search_index.json，启动时只重建发生变化的用户
+- 查询为倒排表求交集，不再逐个读取用户文件
+- 按 BM25F 打分（标题 > 作者 > 简介），只取出当前页的 top-k
+- 查询结果按目录版本号缓存（LRU），目录变化时旧缓存自动失效
+- 同时维护按发布时间排序的目录视图，供游戏列表游标分页
+"""
+import heapq
+import json
+import math
+import re
+import sys
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from backend.utils.cursor import decode_cursor, encode_cursor
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+USERS_DIR = DATA_DIR / "users"
+INDEX_FILE = DATA_DIR / "cache" / "search_index.json"
+CONFIG_PATH = Path(__file__).parent.parent.parent / "config.json"
+
+# 参与索引的字段及其权重（标题 > 作者 > 简介）
+INDEXED_FIELDS = ("title", "author_name", "content")
+FIELD_BOOSTS = (3.0, 2.0, 1.0)
+
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 索引文件格式版本，格式变化时自动重建
+INDEX_VERSION = 2
+
+# 索引修改后延迟保存的秒数（合并短时间内的多次修改）
+SAVE_DELAY = 2.0
+
+# 查询结果缓存的默认内存上限（MB），可在 config.json 的 search_cache_mb 中配置
+DEFAULT_QUERY_CACHE_MB = 8
+
+# CJK 字符（假名、中日韩统一表意文字、韩文）
+_CJK_CHARS = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+_CJK_RE = re.compile(f"[{_CJK_CHARS}]")
+
+# 查询 / 索引片段：连续的 CJK 字符，或拉丁单词（字母、数字）
+_TOKEN_RE = re.compile(f"[{_CJK_CHARS}]+|[0-9a-z\u00c0-\u024f]+")
+
+# game_id -> 游戏记录
+_docs: Dict[str, dict] = {}
+
+# game_id -> 用户文件夹
+_doc_owner: Dict[str, str] = {}
+
+# 游戏文件路径（game_file）-> game_id
+_file_docs: Dict[str, str] = {}
+
+# 用户文件夹 -> 该用户已发布的 game_id 集合
+_user_docs: Dict[str, Set[str]] = {}
+
+# 用户文件夹 -> 建立索引时 published/game.json 的修改时间
+_user_mtimes: Dict[str, float] = {}
+
+# 词项 -> {game_id: 各字段词频}
+_postings: Dict[str, Dict[str, Tuple[int, ...]]] = {}
+
+# game_id -> 各字段长度（词项数）
+_doc_lengths: Dict[str, Tuple[int, ...]] = {}
+
+# 各字段长度总和，用于计算平均长度
+_field_totals: List[int] = [0] * len(INDEXED_FIELDS)
+
+# 按发布时间升序的 (published_at, game_id)，用于目录分页
+_time_keys: List[Tuple[str, str]] = []
+
+# 排序后的拉丁词项，用于前缀匹配（修改后置为 None，下次查询时重建）
+_sorted_terms: Optional[List[str]] = None
+
+# 目录版本号：已发布游戏每次变化时加一
+_generation = 0
+
+# (规范化查询, 排序, offset, limit) -> (版本号, 匹配总数, 当前页 game_id, 估算字节数)
+_query_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_query_cache_bytes = 0
+_query_cache_budget: Optional[int] = None
+
+_loaded = False
+_lock = threading.RLock()
+
+# 加载期间发生变化的用户文件夹，加载完成前重新读取
+_dirty_users: Set[str] = set()
+_dirty_lock = threading.Lock()
+_save_timer: Optional[threading.Timer] = None
+
+
+def is_cjk(text: str) -> bool:
+    """判断片段是否为 CJK 字符"""
+    return bool(_CJK_RE.match(text))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    切分文本为索引词项
+    中文：单字 + 相邻二元组；拉丁文字：小写单词
+    """
+    tokens = []
+    for run in _TOKEN_RE.findall((text or "").lower()):
+        if is_cjk(run):
+            tokens.extend(run)
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def _doc_term_freqs(game: dict) -> Tuple[Dict[str, Tuple[int, ...]], Tuple[int, ...]]:
+    """
+    统计游戏记录的词频
+
+    Returns:
+        (词项 -> 各字段词频, 各字段长度)
+    """
+    freqs: Dict[str, List[int]] = {}
+    lengths = []
+    for i, field in enumerate(INDEXED_FIELDS):
+        tokens = tokenize(game.get(field) or "")
+        lengths.append(len(tokens))
+        for token in tokens:
+            if token not in freqs:
+                freqs[token] = [0] * len(INDEXED_FIELDS)
+            freqs[token][i] += 1
+    return {term: tuple(tf) for term, tf in freqs.items()}, tuple(lengths)
+
+
+def _time_key(game: dict) -> Tuple[str, str]:
+    return game.get('published_at') or '', game['id']
+
+
+def _add_doc(user_folder: str, game: dict):
+    """加入一条游戏记录（调用方持有锁）"""
+    global _sorted_terms
+    game_id = game["id"]
+    if game_id in _docs:
+        _remove_doc(game_id)
+    _docs[game_id] = game
+    _doc_owner[game_id] = user_folder
+    if game.get("game_file"):
+        _file_docs[game["game_file"]] = game_id
+    _user_docs.setdefault(user_folder, set()).add(game_id)
+    insort(_time_keys, _time_key(game))
+
+    freqs, lengths = _doc_term_freqs(game)
+    _doc_lengths[game_id] = lengths
+    for i, length in enumerate(lengths):
+        _field_totals[i] += length
+    for term, tf in freqs.items():
+        if term not in _postings:
+            _postings[term] = {}
+            _sorted_terms = None
+        _postings[term][game_id] = tf
+
+
+def _remove_doc(game_id: str):
+    """移除一条游戏记录（调用方持有锁）"""
+    global _sorted_terms
+    game = _docs.pop(game_id, None)
+    if game is None:
+        return
+    owner = _doc_owner.pop(game_id, None)
+    if _file_docs.get(game.get("game_file")) == game_id:
+        del _file_docs[game["game_file"]]
+    i = bisect_left(_time_keys, _time_key(game))
+    if i < len(_time_keys) and _time_keys[i][1] == game_id:
+        del _time_keys[i]
+    if owner in _user_docs:
+        _user_docs[owner].discard(game_id)
+        if not _user_docs[owner]:
+            del _user_docs[owner]
+    for i, length in enumerate(_doc_lengths.pop(game_id, ())):
+        _field_totals[i] -= length
+    for term in _doc_term_freqs(game)[0]:
+        entries = _postings.get(term)
+        if entries is None:
+            continue
+        entries.pop(game_id, None)
+        if not entries:
+            del _postings[term]
+            _sorted_terms = None
+
+
+def _published_file(user_folder: str) -> Path:
+    return USERS_DIR / user_folder / "published" / "game.json"
+
+
+def _file_mtime(path: Path) -> Optional[float]:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _read_published(user_folder: str) -> List[dict]:
+    """读取用户的已发布游戏"""
+    path = _published_file(user_folder)
+    if not path.exists():
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('posts', [])
+    except Exception as e:
+        print(f"读取用户 {user_folder} 的已发布游戏失败: {e}")
+        return []
+
+
+def _replace_user(user_folder: str, games: List[dict]):
+    """用最新的已发布列表替换某个用户的索引（调用方持有锁）"""
+    global _generation
+    _generation += 1
+    for game_id in list(_user_docs.get(user_folder, ())):
+        _remove_doc(game_id)
+    for game in games:
+        if game.get('status') == 'published' and game.get('id'):
+            _add_doc(user_folder, dict(game))
+
+    mtime = _file_mtime(_published_file(user_folder))
+    if mtime is None:
+        _user_mtimes.pop(user_folder, None)
+    else:
+        _user_mtimes[user_folder] = mtime
+
+
+# === 持久化 ===
+
+def save():
+    """将索引写入磁盘（写临时文件后原子替换）"""
+    with _lock:
+        data = {
+            "version": INDEX_VERSION,
+            "docs": {
+                game_id: [_doc_owner[game_id], game, _doc_lengths[game_id]]
+                for game_id, game in _docs.items()
+            },
+            "postings": _postings,
+            "mtimes": _user_mtimes
+        }
+        INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = INDEX_FILE.with_suffix(".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        tmp_file.replace(INDEX_FILE)
+
+
+def _schedule_save():
+    """延迟保存索引，合并短时间内的多次修改"""
+    global _save_timer
+    with _lock:
+        if _save_timer is not None:
+            _save_timer.cancel()
+        _save_timer = threading.Timer(SAVE_DELAY, save)
+        _save_timer.daemon = True
+        _save_timer.start()
+
+
+def _load_from_disk() -> bool:
+    """从磁盘加载索引，失败时返回 False"""
+    global _sorted_terms
+    if not INDEX_FILE.exists():
+        return False
+    try:
+        with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"读取搜索索引失败，将重建: {e}")
+        return False
+
+    if data.get("version") != INDEX_VERSION:
+        return False
+
+    for game_id, (owner, game, lengths) in data.get("docs", {}).items():
+        _docs[game_id] = game
+        _doc_owner[game_id] = owner
+        if game.get("game_file"):
+            _file_docs[game["game_file"]] = game_id
+        _user_docs.setdefault(owner, set()).add(game_id)
+        _time_keys.append(_time_key(game))
+        _doc_lengths[game_id] = tuple(lengths)
+        for i, length in enumerate(lengths):
+            _field_totals[i] += length
+    for term, entries in data.get("postings", {}).items():
+        _postings[term] = {game_id: tuple(tf) for game_id, tf in entries.items()}
+    _user_mtimes.update(data.get("mtimes", {}))
+    _time_keys.sort()
+    _sorted_terms = None
+    return True
+
+
+def is_loaded() -> bool:
+    """索引是否已加载"""
+    return _loaded
+
+
+def ensure_loaded():
+    """
+    确保索引已加载
+    优先从磁盘加载，只重新索引 game.json 修改时间发生变化的用户
+    """
+    global _loaded
+    if _loaded:
+        return
+
+    with _lock:
+        if _loaded:
+            return
+
+        _load_from_disk()
+
+        current = set()
+        if USERS_DIR.exists():
+            for user_dir in USERS_DIR.iterdir():
+                if user_dir.is_dir():
+                    current.add(user_dir.name)
+
+        changed = False
+        # 已删除的用户
+        for user_folder in set(_user_docs) | set(_user_mtimes):
+            if user_folder not in current:
+                for game_id in list(_user_docs.get(user_folder, ())):
+                    _remove_doc(game_id)
+                _user_mtimes.pop(user_folder, None)
+                changed = True
+
+        # 新增或修改过的用户
+        for user_folder in current:
+            mtime = _file_mtime(_published_file(user_folder))
+            if mtime != _user_mtimes.get(user_folder):
+                _replace_user(user_folder, _read_published(user_folder))
+                changed = True
+
+        # 加载期间发布 / 撤回的用户，其文件可能在上面读取之后才写入
+        with _dirty_lock:
+            for user_folder in _dirty_users:
+                _replace_user(user_folder, _read_published(user_folder))
+                changed = True
+            _dirty_users.clear()
+            _loaded = True
+
+    if changed:
+        save()
+
+
+# === 增量更新 ===
+
+def _defer_if_loading(user_folder: str) -> bool:
+    """
+    尚未加载完成时记录该用户，由 ensure_loaded 在完成前重新读取其文件
+    返回 True 表示已推迟，调用方无需再更新索引
+    """
+    with _dirty_lock:
+        if _loaded:
+            return False
+        _dirty_users.add(user_folder)
+        return True
+
+
+def update_user(user_folder: str, published: List[dict]):
+    """用户的已发布列表发生变化（发布 / 撤回 / 编辑 / 删除）"""
+    if _defer_if_loading(user_folder):
+        return
+    with _lock:
+        _replace_user(user_folder, published)
+    _schedule_save()
+
+
+def remove_user(user_folder: str):
+    """删除用户的所有索引（账户删除）"""
+    if _defer_if_loading(user_folder):
+        return
+    with _lock:
+        _replace_user(user_folder, [])
+    _schedule_save()
+
+
+# === 查询 ===
+
+def _terms_with_prefix(prefix: str) -> List[str]:
+    """查找以 prefix 开头的所有词项"""
+    global _sorted_terms
+    if _sorted_terms is None:
+        _sorted_terms = sorted(_postings)
+    start = bisect_left(_sorted_terms, prefix)
+    result = []
+    for term in _sorted_terms[start:]:
+        if not term.startswith(prefix):
+            break
+        result.append(term)
+    return result
+
+
+def _match_run(run: str) -> Tuple[Set[str], List[str], bool]:
+    """
+    单个查询片段的匹配结果
+
+    Returns:
+        (匹配的 game_id 集合, 参与打分的词项, 是否只取得分最高的词项)
+    """
+    if is_cjk(run):
+        # 单字直接查；多字用二元组求交集，再用原文确认连续出现
+        if len(run) == 1:
+            return set(_postings.get(run, ())), [run], False
+        grams = sorted({run[i:i + 2] for i in range(len(run) - 1)},
+                       key=lambda g: len(_postings.get(g, ())))
+        ids = set(_postings.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not ids:
+                break
+            ids.intersection_update(_postings.get(gram, ()))
+        if len(run) > 2:
+            ids = {
+                game_id for game_id in ids
+                if any(run in (_docs[game_id].get(f) or "").lower() for f in INDEXED_FIELDS)
+            }
+        return ids, grams, False
+
+    # 拉丁单词按前缀匹配（与原来的子串搜索行为接近），取最相关的展开词项打分
+    ids = set()
+    terms = _terms_with_prefix(run)
+    for term in terms:
+        ids.update(_postings[term])
+    return ids, terms, True
+
+
+def _term_score(term: str, game_id: str, doc_count: int, avg_lengths: List[float]) -> float:
+    """BM25F：各字段加权归一化词频后统一饱和"""
+    entries = _postings.get(term)
+    if not entries:
+        return 0.0
+    tf = entries.get(game_id)
+    if tf is None:
+        return 0.0
+
+    lengths = _doc_lengths[game_id]
+    weighted = 0.0
+    for i, freq in enumerate(tf):
+        if freq:
+            norm = 1 - BM25_B + BM25_B * lengths[i] / (avg_lengths[i] or 1)
+            weighted += FIELD_BOOSTS[i] * freq / norm
+
+    df = len(entries)
+    idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+    return idf * weighted / (BM25_K1 + weighted)
+
+
+def _rank(runs: List[str], offset: int, limit: int, sort: str) -> Tuple[int, List[str]]:
+    """
+    各查询片段求交集后排序，只用堆取出前 offset + limit 条（调用方持有锁）
+
+    Returns:
+        (匹配总数, 当前页的 game_id)
+    """
+    matched = None
+    scoring = []
+    for run in runs:
+        ids, terms, best_only = _match_run(run)
+        scoring.append((terms, best_only))
+        matched = ids if matched is None else matched & ids
+        if not matched:
+            return 0, []
+
+    total = len(matched)
+    k = offset + limit
+    if k <= 0 or offset >= total:
+        return total, []
+
+    if sort == "time":
+        top = heapq.nlargest(k, matched, key=lambda gid: _docs[gid].get('published_at') or '')
+        return total, top[offset:]
+
+    doc_count = len(_docs)
+    avg_lengths = [t / doc_count for t in _field_totals] if doc_count else [1.0] * len(_field_totals)
+
+    def score(game_id: str) -> float:
+        value = 0.0
+        for terms, best_only in scoring:
+            scores = (_term_score(t, game_id, doc_count, avg_lengths) for t in terms)
+            value += max(scores, default=0.0) if best_only else sum(scores)
+        return value
+
+    # 同分时较新发布的排在前面
+    top = heapq.nlargest(
+        k,
+        ((score(gid), _docs[gid].get('published_at') or '', gid) for gid in matched)
+    )
+    return total, [gid for _, _, gid in top[offset:]]
+
+
+# === 查询结果缓存 ===
+
+def query_cache_budget() -> int:
+    """查询结果缓存的内存上限（字节）"""
+    global _query_cache_budget
+    if _query_cache_budget is None:
+        megabytes = DEFAULT_QUERY_CACHE_MB
+        try:
+            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+                megabytes = float(json.load(f).get('search_cache_mb', DEFAULT_QUERY_CACHE_MB))
+        except Exception:
+            pass
+        _query_cache_budget = int(megabytes * 1024 * 1024)
+    return _query_cache_budget
+
+
+def _cache_get(key: tuple) -> Optional[Tuple[int, List[str]]]:
+    """读取缓存，版本号不一致时视为未命中并丢弃（调用方持有锁）"""
+    global _query_cache_bytes
+    entry = _query_cache.get(key)
+    if entry is None:
+        return None
+    generation, total, ids, size = entry
+    if generation != _generation:
+        del _query_cache[key]
+        _query_cache_bytes -= size
+        return None
+    _query_cache.move_to_end(key)
+    return total, ids
+
+
+def _cache_put(key: tuple, total: int, ids: List[str]):
+    """写入缓存，超出内存上限时按 LRU 淘汰（调用方持有锁）"""
+    global _query_cache_bytes
+    size = (
+        sys.getsizeof(key) + sys.getsizeof(key[0]) + sys.getsizeof(ids)
+        + sum(sys.getsizeof(gid) for gid in ids) + 64
+    )
+    budget = query_cache_budget()
+    if size > budget:
+        return
+
+    old = _query_cache.pop(key, None)
+    if old is not None:
+        _query_cache_bytes -= old[3]
+    _query_cache[key] = (_generation, total, ids, size)
+    _query_cache_bytes += size
+
+    while _query_cache_bytes > budget:
+        _, evicted = _query_cache.popitem(last=False)
+        _query_cache_bytes -= evicted[3]
+
+
+def normalize_query(query: str) -> Tuple[str, List[str]]:
+    """规范化查询：切分为片段后去重排序（片段之间是交集关系，与顺序无关）"""
+    runs = sorted(set(_TOKEN_RE.findall((query or "").lower())))
+    return " ".join(runs), runs
+
+
+def search(query: str, offset: int = 0, limit: int = 20, sort: str = "relevance") -> Tuple[int, List[dict]]:
+    """
+    搜索已发布游戏
+
+    相同的规范化查询在目录未变化时直接返回缓存的结果。
+
+    Args:
+        query: 搜索关键词
+        offset: 跳过的结果数
+        limit: 返回的结果数
+        sort: relevance（相关度）或 time（发布时间倒序）
+
+    Returns:
+        (匹配总数, 当前页的游戏记录)
+    """
+    ensure_loaded()
+    normalized, runs = normalize_query(query)
+    if not runs:
+        return 0, []
+
+    key = (normalized, sort, offset, limit)
+    with _lock:
+        cached = _cache_get(key)
+        if cached is None:
+            cached = _rank(runs, offset, limit, sort)
+            _cache_put(key, *cached)
+        total, ids = cached
+        return total, [_docs[gid] for gid in ids]
+
+
+def catalog_page(cursor: Optional[str] = None, limit: int = 30) -> Tuple[List[dict], Optional[str]]:
+    """
+    已发布游戏按发布时间倒序分页
+
+    Args:
+        cursor: 上一页返回的游标，None 表示第一页；格式错误时抛出 ValueError
+        limit: 每页数量
+
+    Returns:
+        (当前页, 下一页游标)；没有更多时游标为 None
+    """
+    key = None
+    if cursor:
+        key = decode_cursor(cursor)
+
+    ensure_loaded()
+    with _lock:
+        end = len(_time_keys) if key is None else bisect_left(_time_keys, key)
+        start = max(0, end - limit)
+        games = [_docs[game_id] for _, game_id in reversed(_time_keys[start:end])]
+        next_cursor = encode_cursor(_time_keys[start]) if start > 0 else None
+        return games, next_cursor
+
+
+def iter_catalog(batch: int = 100) -> Iterator[dict]:
+    """
+    按发布时间倒序逐条返回所有已发布游戏（用于流式输出）
+    每次只在锁内取出一批，不生成完整列表；遍历期间发生的修改按游标位置继续
+    """
+    cursor = None
+    while True:
+        games, cursor = catalog_page(cursor, batch)
+        yield from games
+        if cursor is None:
+            return
+
+
+def generation() -> int:
+    """当前目录版本号"""
+    return _generation
+
+
+def docs_by_user() -> Dict[str, List[dict]]:
+    """按用户文件夹分组的已发布游戏"""
+    ensure_loaded()
+    with _lock:
+        return {
+            user_folder: [_docs[game_id] for game_id in ids]
+            for user_folder, ids in _user_docs.items()
+        }
+
+
+def owner_of(game_id: str) -> Optional[str]:
+    """已发布游戏所属的用户文件夹"""
+    ensure_loaded()
+    return _doc_owner.get(game_id)
+
+
+def game_for_file(game_file: str) -> Optional[str]:
+    """游戏文件路径对应的已发布游戏 id"""
+    ensure_loaded()
+    return _file_docs.get(game_file)
+
+
+def get_doc(game_id: str) -> Optional[dict]:
+    """获取索引中的游戏记录"""
+    ensure_loaded()
+    return _docs.get(game_id)
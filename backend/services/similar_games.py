@@ -0,0 +1,147 @@
+"""
+相似游戏推荐
+- 对已发布游戏的标题和简介建立 TF-IDF 向量（特征哈希到固定维度）
+- 用 NumPy 分块矩阵乘法计算余弦相似度，预先保存每个游戏的 top-k 邻居表
+- 目录变化后在后台线程中延迟重算，请求时只查表，耗时 O(k)
+"""
+import threading
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend.services import search_index
+
+# 特征哈希维度
+HASH_DIM = 2048
+
+# 每个游戏保存的邻居数
+NEIGHBORS = 20
+
+# 相似度低于该值的不作为推荐
+MIN_SIMILARITY = 0.05
+
+# 每次矩阵乘法处理的行数，限制峰值内存
+BLOCK_ROWS = 256
+
+# 目录变化后延迟重算的秒数（合并短时间内的多次发布）
+REFRESH_DELAY = 5.0
+
+# 标题词项的权重（重复计数次数）
+TITLE_WEIGHT = 2
+
+# game_id -> 按相似度降序的邻居 game_id
+_neighbors: Dict[str, List[str]] = {}
+
+# 邻居表对应的目录版本号
+_built_generation: Optional[int] = None
+
+_lock = threading.Lock()
+_refresh_timer: Optional[threading.Timer] = None
+
+
+def _term_slot(term: str) -> int:
+    """词项哈希到特征维度"""
+    return zlib.crc32(term.encode('utf-8')) % HASH_DIM
+
+
+def _vectorize(games: List[dict]) -> np.ndarray:
+    """构建 L2 归一化的 TF-IDF 矩阵（每行一个游戏）"""
+    matrix = np.zeros((len(games), HASH_DIM), dtype=np.float32)
+    for row, game in enumerate(games):
+        counts = Counter(search_index.tokenize(game.get('content') or ""))
+        for term in search_index.tokenize(game.get('title') or ""):
+            counts[term] += TITLE_WEIGHT
+        for term, count in counts.items():
+            matrix[row, _term_slot(term)] += count
+
+    # 亚线性词频 × 平滑 IDF
+    np.log1p(matrix, out=matrix)
+    df = np.count_nonzero(matrix, axis=0)
+    idf = np.log((1 + len(games)) / (1 + df)) + 1
+    matrix *= idf.astype(np.float32)
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    matrix /= norms
+    return matrix
+
+
+def compute_neighbors(games: List[dict], k: int = NEIGHBORS) -> Dict[str, List[str]]:
+    """分块计算所有游戏的 top-k 相似邻居"""
+    n = len(games)
+    if n < 2:
+        return {}
+
+    ids = [game['id'] for game in games]
+    matrix = _vectorize(games)
+    k = min(k, n - 1)
+    neighbors = {}
+
+    for start in range(0, n, BLOCK_ROWS):
+        end = min(start + BLOCK_ROWS, n)
+        sims = matrix[start:end] @ matrix.T
+        # 排除自身
+        sims[np.arange(end - start), np.arange(start, end)] = -1
+
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_sims, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_sims = np.take_along_axis(top_sims, order, axis=1)
+
+        for offset in range(end - start):
+            neighbors[ids[start + offset]] = [
+                ids[j] for j, sim in zip(top[offset], top_sims[offset])
+                if sim >= MIN_SIMILARITY
+            ]
+
+    return neighbors
+
+
+def refresh():
+    """按当前目录重算邻居表"""
+    global _neighbors, _built_generation
+    search_index.ensure_loaded()
+    generation = search_index.generation()
+    games = [game for games in search_index.docs_by_user().values() for game in games]
+    neighbors = compute_neighbors(games)
+
+    with _lock:
+        _neighbors = neighbors
+        _built_generation = generation
+
+
+def schedule_refresh():
+    """目录变化后在后台延迟重算邻居表"""
+    global _refresh_timer
+    with _lock:
+        if _built_generation is None:
+            # 尚未构建，首次请求时会构建
+            return
+        if _refresh_timer is not None:
+            _refresh_timer.cancel()
+        _refresh_timer = threading.Timer(REFRESH_DELAY, refresh)
+        _refresh_timer.daemon = True
+        _refresh_timer.start()
+
+
+def is_built() -> bool:
+    """邻居表是否已构建"""
+    return _built_generation is not None
+
+
+def similar(game_id: str, limit: int = 6) -> List[dict]:
+    """
+    查询相似游戏
+    跳过重算前已撤回或删除的游戏
+    """
+    result = []
+    for neighbor_id in _neighbors.get(game_id, ()):
+        game = search_index.get_doc(neighbor_id)
+        if game is not None:
+            result.append(game)
+            if len(result) >= limit:
+                break
+    return result
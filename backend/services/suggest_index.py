@@ -0,0 +1,154 @@
+"""
+搜索框自动补全索引
+- 对已发布游戏的标题和作者名建立有序数组前缀索引
+- 标题中每个拉丁单词的开头也可以匹配（如 "tet" 匹配 "Space Tetris"）
+- 发布 / 撤回 / 编辑 / 删除时按用户增量更新
+"""
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, List, Tuple
+
+from backend.services import search_index
+
+# 单次前缀查询最多检查的候选数，保证查询耗时有上限
+MAX_SCAN = 256
+
+# 拉丁单词开头的位置（前一个字符不是字母或数字）
+_WORD_START_RE = re.compile(r"(?<![0-9a-z\u00c0-\u024f])[0-9a-z\u00c0-\u024f]")
+
+# 有序的 (匹配键, 类型, 原文)
+_keys: List[Tuple[str, str, str]] = []
+
+# (类型, 原文) -> 引用次数（同名标题 / 同一作者的多个游戏）
+_counts: Dict[Tuple[str, str], int] = {}
+
+# 用户文件夹 -> 该用户贡献的 (类型, 原文) 列表
+_user_entries: Dict[str, List[Tuple[str, str]]] = {}
+
+_loaded = False
+_lock = threading.RLock()
+
+
+def normalize(text: str) -> str:
+    """规范化匹配文本（小写，合并空白）"""
+    return " ".join((text or "").lower().split())
+
+
+def _match_keys(text: str) -> List[str]:
+    """一个补全项的所有匹配键：完整文本 + 从每个拉丁单词开头截取的后缀"""
+    norm = normalize(text)
+    keys = [norm]
+    for match in _WORD_START_RE.finditer(norm):
+        if match.start() > 0:
+            keys.append(norm[match.start():])
+    return keys
+
+
+def _add_entry(kind: str, text: str):
+    """增加补全项引用（调用方持有锁）"""
+    entry = (kind, text)
+    count = _counts.get(entry, 0)
+    _counts[entry] = count + 1
+    if count == 0:
+        for key in _match_keys(text):
+            insort(_keys, (key, kind, text))
+
+
+def _remove_entry(kind: str, text: str):
+    """减少补全项引用，归零时从有序数组中删除（调用方持有锁）"""
+    entry = (kind, text)
+    count = _counts.get(entry, 0)
+    if count > 1:
+        _counts[entry] = count - 1
+        return
+    _counts.pop(entry, None)
+    for key in _match_keys(text):
+        item = (key, kind, text)
+        i = bisect_left(_keys, item)
+        if i < len(_keys) and _keys[i] == item:
+            del _keys[i]
+
+
+def _entries_of(games: List[dict]) -> List[Tuple[str, str]]:
+    """已发布游戏贡献的补全项"""
+    entries = []
+    for game in games:
+        if game.get('status') != 'published':
+            continue
+        if game.get('title'):
+            entries.append(("title", game['title']))
+        if game.get('author_name'):
+            entries.append(("author", game['author_name']))
+    return entries
+
+
+def _replace_user(user_folder: str, games: List[dict]):
+    """用最新的已发布列表替换某个用户的补全项（调用方持有锁）"""
+    for kind, text in _user_entries.pop(user_folder, []):
+        _remove_entry(kind, text)
+    entries = _entries_of(games)
+    for kind, text in entries:
+        _add_entry(kind, text)
+    if entries:
+        _user_entries[user_folder] = entries
+
+
+def is_loaded() -> bool:
+    """索引是否已加载"""
+    return _loaded
+
+
+def ensure_loaded():
+    """从搜索索引中的已发布游戏构建补全索引"""
+    global _loaded
+    if _loaded:
+        return
+
+    with _lock:
+        if _loaded:
+            return
+        for user_folder, games in search_index.docs_by_user().items():
+            _replace_user(user_folder, games)
+        _loaded = True
+
+
+def update_user(user_folder: str, published: List[dict]):
+    """用户的已发布列表发生变化（发布 / 撤回 / 编辑 / 删除）"""
+    with _lock:
+        # 加锁后再判断：正在构建时等待构建完成再更新，避免更新丢失
+        if not _loaded:
+            return
+        _replace_user(user_folder, published)
+
+
+def remove_user(user_folder: str):
+    """删除用户的所有补全项（账户删除）"""
+    update_user(user_folder, [])
+
+
+def suggest(prefix: str, limit: int = 8) -> List[dict]:
+    """
+    返回以 prefix 开头的补全建议
+    按引用次数（同名游戏数 / 作者的游戏数）降序，同分时标题优先、字典序
+    """
+    ensure_loaded()
+    key = normalize(prefix)
+    if not key:
+        return []
+
+    with _lock:
+        seen = set()
+        candidates = []
+        i = bisect_left(_keys, (key,))
+        while i < len(_keys) and len(candidates) < MAX_SCAN:
+            match_key, kind, text = _keys[i]
+            if not match_key.startswith(key):
+                break
+            if (kind, text) not in seen:
+                seen.add((kind, text))
+                candidates.append((-_counts.get((kind, text), 0), kind != "title", text, kind))
+            i += 1
+
+    candidates.sort()
+    return [{"text": text, "type": kind} for _, _, text, kind in candidates[:limit]]
@@ -1,4 +1,4 @@
 # Utils package
-from . import auth, user_manager
+from . import auth, user_manager, fast_json, response_cache, single_flight, file_transaction, id_generator, cursor
 
-__all__ = ["auth", "user_manager"]
+__all__ = ["auth", "user_manager", "fast_json", "response_cache", "single_flight", "file_transaction", "id_generator", "cursor"]
@@ -24,7 +24,9 @@ def ensure_config():
             "stream_name": "RadioCult.fm",
             "jwt_secret": "your-secret-key-change-in-production",
             "jwt_algorithm": "HS256",
-            "jwt_expiration_days": 7
+            "jwt_expiration_days": 7,
+            "search_cache_mb": 8,
+            "chat_capacity": 200
         }
         
         with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
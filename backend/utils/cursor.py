@@ -0,0 +1,26 @@
+"""
+分页游标
+- 游标对客户端不透明：排序键 (发布时间, id) 编码为 URL 安全的 base64
+- 客户端只需原样传回上一页返回的 next_cursor
+"""
+import base64
+import binascii
+from typing import Tuple
+
+
+def encode_cursor(key: Tuple[str, str]) -> str:
+    """把排序键编码为游标"""
+    raw = f"{key[0]}|{key[1]}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """解析游标，格式错误时抛出 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode('utf-8')
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError(cursor)
+    published_at, sep, item_id = raw.partition("|")
+    if not sep or not item_id:
+        raise ValueError(cursor)
+    return published_at, item_id
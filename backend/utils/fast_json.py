@@ -0,0 +1,121 @@
+"""
+快速 JSON 序列化
+- 优先使用 orjson，未安装时回退到标准库 json
+- 默认响应类使用快速编码器；raw_json() 直接返回已编码的字节，跳过 jsonable_encoder
+- 大列表逐块流式编码，避免一次性生成完整的 JSON 字符串
+"""
+import json
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 为可选依赖
+    orjson = None
+
+
+def dumps(data: Any) -> bytes:
+    """序列化为紧凑的 UTF-8 JSON 字节（中文不转义）"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(
+        data,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+def loads(data):
+    """解析 JSON（str 或 bytes）"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    使用快速编码器的 JSON 响应（作为应用的默认响应类）
+
+    路由的返回值会先经过 jsonable_encoder；已编码的 JSON 字节请用 raw_json() 直接返回。
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def raw_json(body: bytes, **kwargs) -> Response:
+    """直接返回已编码的 JSON 字节（仅用于可信的内部数据，不做任何校验）"""
+    return Response(content=body, media_type="application/json", **kwargs)
+
+
+# 流式响应每个数据块的大小上限（字节）
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# 列表长度超过该值时使用流式响应
+STREAM_THRESHOLD = 200
+
+
+def iter_json_collection(
+    key: str,
+    items: Iterable[Any],
+    head: Optional[dict] = None,
+    tail: Optional[Callable[[int], dict]] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    逐块生成 {...head, key: [items...], ...tail} 形式的 JSON
+
+    每次只编码一个元素，累积到 chunk_size 后输出，内存占用与列表长度无关。
+
+    Args:
+        key: 列表字段名
+        items: 列表元素迭代器（可以是生成器）
+        head: 列表之前输出的字段
+        tail: 接收元素数量、返回列表之后输出的字段（如 total）
+        chunk_size: 数据块大小上限
+    """
+    buffer = bytearray(b"{")
+    for name, value in (head or {}).items():
+        buffer += dumps(name) + b":" + dumps(value) + b","
+    buffer += dumps(key) + b":["
+
+    count = 0
+    for item in items:
+        if count:
+            buffer += b","
+        buffer += dumps(item)
+        count += 1
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+
+    buffer += b"]"
+    for name, value in (tail(count) if tail else {}).items():
+        buffer += b"," + dumps(name) + b":" + dumps(value)
+    buffer += b"}"
+    yield bytes(buffer)
+
+
+def collection_response(
+    key: str,
+    items: Iterable[Any],
+    head: Optional[dict] = None,
+    tail: Optional[Callable[[int], dict]] = None,
+    stream: Optional[bool] = None
+) -> Response:
+    """
+    返回列表型 JSON 响应
+
+    stream 为 None 时，列表长度超过 STREAM_THRESHOLD 才使用流式响应；
+    生成器等无法预知长度的迭代器总是流式输出。
+    """
+    if stream is None:
+        stream = not hasattr(items, '__len__') or len(items) > STREAM_THRESHOLD
+
+    body = iter_json_collection(key, items, head, tail)
+    if stream:
+        return StreamingResponse(body, media_type="application/json")
+    return raw_json(b"".join(body))
@@ -0,0 +1,120 @@
+"""
+多文件原子提交（用户文件夹中的 JSON 文档）
+- 所有文档的新内容先写入一个提交日志，fsync 后原子重命名，作为提交点
+- 再逐个写临时文件、fsync 后 os.replace 到目标位置，目标目录 fsync 后才删除日志
+- 代价：每次多文件提交把所有文档完整写两遍（日志 + 目标文件），并有多次 fsync
+- 启动时 recover() 重放残留的日志：多个文档要么全部更新，要么都保持原样
+"""
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+JOURNAL_DIR = DATA_DIR / "txn"
+
+
+def _fsync_dir(path: Path):
+    """持久化目录项（重命名），不支持的平台上跳过"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_document(path: Path, document: Any):
+    """写临时文件并 fsync 后原子替换目标文件"""
+    if not path.parent.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 新建的目录项也要持久化
+        _fsync_dir(path.parent.parent)
+    tmp_file = path.with_name(path.name + ".tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    tmp_file.replace(path)
+
+
+def _apply(entries: List[dict]):
+    """
+    把日志中的文档写到目标位置（重复执行结果相同）
+    返回前持久化所有目标目录，之后才能删除日志
+    """
+    paths = [DATA_DIR / entry['path'] for entry in entries]
+    for path, entry in zip(paths, entries):
+        _write_document(path, entry['document'])
+    for directory in {path.parent for path in paths}:
+        _fsync_dir(directory)
+
+
+def commit(documents: Dict[Path, Any]):
+    """
+    原子地写入多个 JSON 文档
+
+    Args:
+        documents: 目标路径（位于 data 目录下）-> 文档内容
+    """
+    entries = [
+        {"path": path.relative_to(DATA_DIR).as_posix(), "document": document}
+        for path, document in documents.items()
+    ]
+
+    # 单个文档直接原子替换即可
+    if len(entries) == 1:
+        _apply(entries)
+        return
+
+    JOURNAL_DIR.mkdir(parents=True, exist_ok=True)
+    journal = JOURNAL_DIR / f"{uuid.uuid4().hex}.json"
+    tmp_file = journal.with_suffix(".tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({"entries": entries}, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+
+    # 提交点：重命名后日志完整可见
+    tmp_file.replace(journal)
+    _fsync_dir(JOURNAL_DIR)
+
+    _apply(entries)
+    journal.unlink()
+    _fsync_dir(JOURNAL_DIR)
+
+
+def recover() -> int:
+    """
+    重放上次异常退出时已提交但未完成的日志，丢弃未提交的日志
+
+    Returns:
+        重放的事务数
+    """
+    if not JOURNAL_DIR.exists():
+        return 0
+
+    # 未到达提交点的事务，目标文件未被修改
+    for tmp_file in JOURNAL_DIR.glob("*.tmp"):
+        tmp_file.unlink(missing_ok=True)
+
+    replayed = 0
+    for journal in sorted(JOURNAL_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime):
+        try:
+            with open(journal, 'r', encoding='utf-8') as f:
+                entries = json.load(f)["entries"]
+            _apply(entries)
+            replayed += 1
+        except Exception as e:
+            print(f"重放提交日志 {journal.name} 失败: {e}")
+            continue
+        journal.unlink(missing_ok=True)
+
+    if replayed:
+        print(f"已恢复 {replayed} 个未完成的文件提交")
+    return replayed
@@ -0,0 +1,61 @@
+"""
+记录 ID 生成器（游戏、通告、公告）
+- 格式：YYYYmmddHHMMSS + 毫秒(3位) + 节点号(4位) + 序号(3位)，共 24 位数字
+- 同一进程内单调递增，同一毫秒内用序号区分，时钟回拨时沿用上次的时间
+- 前 14 位与旧的按秒生成的 ID 相同，新旧 ID 按字符串比较即为创建时间顺序
+- 应用只支持单进程运行（见部署指南）。节点号 WORKER_ID（0-9999）未设置时随机选取；
+  若有多个进程同时生成 ID（如离线脚本），需为每个进程设置不同的 WORKER_ID，
+  否则两个进程随机到同一节点号时（概率万分之一）同一毫秒内生成的 ID 可能重复
+"""
+import os
+import secrets
+import threading
+import time
+from datetime import datetime
+
+# 每毫秒最多生成的 ID 数
+MAX_SEQUENCE = 1000
+
+# 节点号的取值范围
+MAX_WORKER_ID = 10000
+
+
+def _worker_id() -> int:
+    """读取 WORKER_ID，未设置时随机选取"""
+    value = os.environ.get("WORKER_ID")
+    if value is None:
+        return secrets.randbelow(MAX_WORKER_ID)
+    worker_id = int(value)
+    if not 0 <= worker_id < MAX_WORKER_ID:
+        raise ValueError(f"WORKER_ID 必须在 0-{MAX_WORKER_ID - 1} 之间: {value}")
+    return worker_id
+
+
+# 节点号：同时生成 ID 的多个进程通过环境变量 WORKER_ID 区分
+WORKER_ID = _worker_id()
+
+_lock = threading.Lock()
+_last_ms = 0
+_sequence = 0
+
+
+def new_id() -> str:
+    """生成一个新的 ID"""
+    global _last_ms, _sequence
+
+    with _lock:
+        now_ms = max(int(time.time() * 1000), _last_ms)
+        if now_ms == _last_ms:
+            _sequence += 1
+            if _sequence >= MAX_SEQUENCE:
+                # 本毫秒的序号用完，借用下一毫秒
+                now_ms += 1
+                _sequence = 0
+        else:
+            _sequence = 0
+        _last_ms = now_ms
+        sequence = _sequence
+
+    seconds, millis = divmod(now_ms, 1000)
+    stamp = datetime.fromtimestamp(seconds).strftime("%Y%m%d%H%M%S")
+    return f"{stamp}{millis:03d}{WORKER_ID:04d}{sequence:03d}"
@@ -0,0 +1,139 @@
+"""
+HTTP 响应缓存
+- 按路由 + 查询参数缓存序列化后的 JSON 字节
+- 每个缓存项标记其依赖的数据集合（games、bulletins、announcements、config 等）
+- 写操作调用 invalidate(tag) 精确失效相关缓存
+- 支持 ETag / If-None-Match 返回 304
+"""
+import hashlib
+import inspect
+from collections import OrderedDict
+from email.utils import parsedate
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+
+from backend.utils import fast_json
+
+# 最多缓存的响应数量（超出后按 LRU 淘汰）
+MAX_ENTRIES = 1024
+
+# key -> {"body": bytes, "etag": str, "tags": tuple}
+_entries: "OrderedDict[str, dict]" = OrderedDict()
+
+# tag -> 依赖该 tag 的缓存 key 集合
+_tag_index: Dict[str, Set[str]] = {}
+
+# tag -> 失效次数，用于丢弃构建期间已被失效的结果
+_generations: Dict[str, int] = {}
+
+
+def encode_json(data) -> bytes:
+    """序列化为 JSON 字节"""
+    return fast_json.dumps(data)
+
+
+def make_etag(body: bytes) -> str:
+    """根据响应内容生成 ETag"""
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def cache_key(request: Request) -> str:
+    """缓存键：路径 + 排序后重新编码的查询参数（参数名和值中的 & = 等字符会被转义）"""
+    query = sorted(request.query_params.multi_items())
+    if not query:
+        return request.url.path
+    return request.url.path + "?" + urlencode(query)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """判断请求的 If-None-Match 是否命中"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [c.strip() for c in header.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: Optional[str]) -> bool:
+    """判断 If-Modified-Since 是否不早于资源的 Last-Modified（请求带 If-None-Match 时应只看 ETag）"""
+    since = parsedate(if_modified_since or "")
+    modified = parsedate(last_modified or "")
+    return since is not None and modified is not None and since >= modified
+
+
+def json_bytes_response(request: Request, body: bytes, etag: str) -> Response:
+    """返回 JSON 字节响应，ETag 命中时返回 304"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return fast_json.raw_json(body, headers=headers)
+
+
+def _store(key: str, body: bytes, etag: str, tags: tuple):
+    """写入缓存并建立 tag 索引"""
+    _entries[key] = {"body": body, "etag": etag, "tags": tags}
+    _entries.move_to_end(key)
+    for tag in tags:
+        _tag_index.setdefault(tag, set()).add(key)
+
+    while len(_entries) > MAX_ENTRIES:
+        old_key, old_entry = _entries.popitem(last=False)
+        for tag in old_entry["tags"]:
+            keys = _tag_index.get(tag)
+            if keys:
+                keys.discard(old_key)
+
+
+async def cached_response(request: Request, tags: Iterable[str], build: Callable[[], Any]) -> Response:
+    """
+    返回缓存的 JSON 响应，未命中时调用 build() 生成并缓存
+
+    Args:
+        request: 当前请求
+        tags: 该响应依赖的数据集合
+        build: 生成响应数据的函数，可以是普通函数或协程函数
+               （抛出的 HTTPException 不会被缓存）
+    """
+    key = cache_key(request)
+    entry = _entries.get(key)
+
+    if entry is None:
+        tags = tuple(tags)
+        generations = [_generations.get(tag, 0) for tag in tags]
+
+        data = build()
+        if inspect.isawaitable(data):
+            data = await data
+        body = encode_json(data)
+        entry = {"body": body, "etag": make_etag(body), "tags": tags}
+
+        # 构建期间数据被修改时不写入缓存，避免缓存旧数据
+        if generations == [_generations.get(tag, 0) for tag in tags]:
+            _store(key, entry["body"], entry["etag"], tags)
+    else:
+        _entries.move_to_end(key)
+
+    return json_bytes_response(request, entry["body"], entry["etag"])
+
+
+def generation(tag: str) -> int:
+    """数据集合的失效次数（可用于区分失效前后开始的计算）"""
+    return _generations.get(tag, 0)
+
+
+def invalidate(*tags: str):
+    """使依赖指定数据集合的所有缓存失效"""
+    for tag in tags:
+        _generations[tag] = _generations.get(tag, 0) + 1
+        for key in _tag_index.pop(tag, set()):
+            entry = _entries.pop(key, None)
+            if entry is None:
+                continue
+            # 同时从其他 tag 的索引中移除
+            for other in entry["tags"]:
+                if other != tag and other in _tag_index:
+                    _tag_index[other].discard(key)
@@ -0,0 +1,42 @@
+"""
+请求合并（single-flight）
+- 相同 key 的并发计算只执行一次，其余调用方等待同一个结果
+- 计算在线程池中执行，不阻塞事件循环
+- 计算完成后立即移除 key，之后的调用会重新计算
+"""
+import asyncio
+from typing import Any, Callable, Dict
+
+from starlette.concurrency import run_in_threadpool
+
+# key -> 正在执行的任务
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+async def run(key: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    执行 func(*args, **kwargs)，相同 key 的并发调用共享同一次执行结果
+
+    注意：所有调用方拿到的是同一个对象，调用方不应修改返回值。
+
+    Args:
+        key: 合并键（通常为 路由 + 参数）
+        func: 同步函数，在线程池中执行
+    """
+    task = _inflight.get(key)
+
+    if task is None:
+        task = asyncio.ensure_future(run_in_threadpool(func, *args, **kwargs))
+        _inflight[key] = task
+
+        def _done(finished: asyncio.Task):
+            if _inflight.get(key) is finished:
+                del _inflight[key]
+            # 标记异常已读取，避免无人等待时输出警告
+            if not finished.cancelled():
+                finished.exception()
+
+        task.add_done_callback(_done)
+
+    # shield：某个调用方被取消时不影响其他等待者
+    return await asyncio.shield(task)
@@ -457,6 +457,14 @@ def delete_user_account(user_id: str):
         user_dir = USERS_DIR / user_folder
         if user_dir.exists():
             shutil.rmtree(user_dir)
+            
+            # 用户的已发布游戏随文件夹一起删除
+            from backend.utils import response_cache
+            from backend.services import search_index, suggest_index, similar_games
+            response_cache.invalidate("games")
+            search_index.remove_user(user_folder)
+            suggest_index.remove_user(user_folder)
+            similar_games.schedule_refresh()
     
     # 从用户列表中删除
     users = [u for u in users if u['id'] != user_id]
@@ -96,8 +96,8 @@ export class ContentCard {
     renderSimple() {
         const { post } = this;
         
-        // 截断内容为摘要
-        const contentPreview = HtmlHelpers.truncate(post.content, 100);
+        // 列表接口返回预先生成的摘要，否则截断正文
+        const contentPreview = post.excerpt ?? HtmlHelpers.truncate(post.content, 100);
         
         // 获取第一张缩略图
         const thumbnail = post.images && post.images.length > 0 ? post.images[0] : null;
@@ -14,6 +14,7 @@ export class MainContentArea {
         this.container = container;
         this.stateManager = stateManager;
         this.posts = [];
+        this.nextCursor = null;
         this.currentPost = null;
         this.currentType = null;
         
@@ -37,6 +38,13 @@ export class MainContentArea {
                 return;
             }
 
+            // 处理"加载更多"按钮
+            const loadMoreBtn = e.target.closest('.load-more-btn');
+            if (loadMoreBtn) {
+                this.loadMore(this.currentType, loadMoreBtn);
+                return;
+            }
+
             // 处理分享按钮点击
             if (e.target.closest('.share-btn')) {
                 e.stopPropagation();
@@ -103,22 +111,10 @@ export class MainContentArea {
         this.container.innerHTML = EmptyState.loading().render();
 
         try {
-            // 根据类型选择正确的 API
-            let apiUrl;
-            if (type === 'announcement') {
-                apiUrl = '/announcement/list';
-            } else {
-                apiUrl = `/content/${type}`;
-            }
-            
-            const response = await api.get(apiUrl);
-            
-            // 处理不同的响应格式
-            if (type === 'announcement') {
-                this.posts = response.announcements || [];
-            } else {
-                this.posts = response;
-            }
+            // 列表只返回摘要，按游标分页
+            const response = await api.get(`/${type}/list`);
+            this.posts = response[`${type}s`] || [];
+            this.nextCursor = response.next_cursor || null;
             
             if (this.posts.length === 0) {
                 this.container.innerHTML = new EmptyState({
@@ -131,9 +127,8 @@ export class MainContentArea {
 
             const html = `
                 <div style="padding: var(--content-padding);">
-                    ${this.posts.map(post => {
-                        return `<div data-post-id="${post.id}">${new ContentCard(post).renderSimple()}</div>`;
-                    }).join('')}
+                    <div class="post-list">${this.renderPostItems(this.posts)}</div>
+                    ${this.renderLoadMore()}
                 </div>
             `;
             this.container.innerHTML = html;
@@ -143,6 +138,53 @@ export class MainContentArea {
         }
     }
 
+    /**
+     * 渲染列表项
+     */
+    renderPostItems(posts) {
+        return posts.map(post => {
+            return `<div data-post-id="${post.id}">${new ContentCard(post).renderSimple()}</div>`;
+        }).join('');
+    }
+
+    /**
+     * 渲染"加载更多"按钮（还有下一页时）
+     */
+    renderLoadMore() {
+        if (!this.nextCursor) return '';
+        return `
+            <div style="text-align: center; margin-top: var(--section-gap);">
+                <button class="load-more-btn btn btn-sm">加载更多</button>
+            </div>
+        `;
+    }
+
+    /**
+     * 加载下一页并追加到列表
+     */
+    async loadMore(type, button) {
+        if (!this.nextCursor) return;
+        button.disabled = true;
+        
+        try {
+            const cursor = encodeURIComponent(this.nextCursor);
+            const response = await api.get(`/${type}/list?cursor=${cursor}`);
+            const posts = response[`${type}s`] || [];
+            this.posts = this.posts.concat(posts);
+            this.nextCursor = response.next_cursor || null;
+            
+            this.container.querySelector('.post-list').insertAdjacentHTML('beforeend', this.renderPostItems(posts));
+            if (!this.nextCursor) {
+                button.parentElement.remove();
+            }
+        } catch (error) {
+            console.error('加载失败:', error);
+            toast.error('加载失败，请重试');
+        } finally {
+            button.disabled = false;
+        }
+    }
+
     /**
      * 渲染详情页
      */
@@ -157,16 +199,9 @@ export class MainContentArea {
         this.container.innerHTML = EmptyState.loading().render();
 
         try {
-            // 如果已经加载了列表，直接从中查找
-            if (this.posts.length > 0) {
-                this.currentPost = this.posts.find(p => p.id === itemId);
-            }
-
-            // 如果没找到，重新加载列表
-            if (!this.currentPost) {
-                this.posts = await api.get(`/content/${type}`);
-                this.currentPost = this.posts.find(p => p.id === itemId);
-            }
+            // 列表中只有摘要，完整内容单独获取
+            const response = await api.get(`/${type}/detail/${encodeURIComponent(itemId)}`);
+            this.currentPost = response[type] || null;
 
             if (!this.currentPost) {
                 this.container.innerHTML = EmptyState.error().render();
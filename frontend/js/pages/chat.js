@@ -2,6 +2,7 @@
  * 留言板
  * - 需要登录才能发送留言
  * - 自动从登录状态获取昵称
+ * - 优先通过 SSE 实时接收消息，不支持或连接失败时退回轮询
  */
 
 import { toast } from '/js/components/Toast.js';
@@ -10,15 +11,19 @@ import { authUI } from '/js/components/AuthUI.js';
 class ChatApp {
     constructor() {
         this.messages = [];
+        this.seq = null;
+        this.etag = null;
         this.userColors = new Map();
         this.colorIndex = 1;
         this.maxColors = 6;
         this.pollInterval = null;
+        this.eventSource = null;
         
         this.initElements();
         this.bindEvents();
         this.loadMessages();
         this.startPolling();
+        this.connectStream();
     }
 
     initElements() {
@@ -126,35 +131,118 @@ class ChatApp {
 
     async loadMessages() {
         try {
-            const response = await fetch('/api/chat/messages');
+            // 已有序号时只拉取增量，消息未变化时服务器返回 304
+            const url = this.seq === null
+                ? '/api/chat/messages'
+                : `/api/chat/messages?since=${this.seq}`;
+            const headers = this.etag ? { 'If-None-Match': this.etag } : {};
+            const response = await fetch(url, { headers });
+            
+            if (response.status === 304) return;
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            
+            this.etag = response.headers.get('ETag');
             const data = await response.json();
             
-            const serverMessages = data.messages || [];
+            if (this.seq === null || data.reset) {
+                this.messages = data.messages || [];
+            } else {
+                const deleted = new Set(data.deleted || []);
+                const known = new Set(this.messages.map(m => m.id));
+                this.messages = this.messages
+                    .filter(m => !deleted.has(m.id))
+                    .concat((data.messages || []).filter(m => !known.has(m.id)));
+            }
+            
+            const changed = this.seq !== data.seq;
+            this.seq = data.seq;
             
-            // 只在消息数量变化时重新渲染
-            if (serverMessages.length !== this.messages.length) {
-                this.messages = serverMessages;
-                
-                // 清空并重新渲染所有消息
-                this.messagesContainer.innerHTML = '';
-                this.messages.forEach(msg => {
-                    this.renderMessage(msg);
-                });
-                
-                this.scrollToBottom();
+            if (changed) {
+                this.renderAll();
             }
         } catch (e) {
             console.error('加载消息失败:', e);
         }
     }
 
+    /**
+     * 应用实时推送的变更序号
+     * 序号不连续说明错过了事件，拉取一次增量补齐
+     */
+    advanceSeq(seq) {
+        if (this.seq === null) return;
+        if (seq === this.seq + 1) {
+            this.seq = seq;
+        } else if (seq > this.seq) {
+            this.loadMessages();
+        }
+    }
+
     startPolling() {
+        if (this.pollInterval) return;
+        
         // 每3秒自动刷新消息
         this.pollInterval = setInterval(() => {
             this.loadMessages();
         }, 3000);
     }
 
+    connectStream() {
+        if (!window.EventSource) return;
+        
+        this.eventSource = new EventSource('/api/chat/stream');
+        
+        // 连接成功：停止轮询，并同步一次断线期间的消息
+        this.eventSource.addEventListener('open', () => {
+            this.stopPolling();
+            this.loadMessages();
+        });
+        
+        // 连接断开：浏览器会自动重连，期间退回轮询
+        this.eventSource.addEventListener('error', () => {
+            this.startPolling();
+        });
+        
+        this.eventSource.addEventListener('message', (e) => {
+            const message = JSON.parse(e.data);
+            if (this.messages.some(m => m.id === message.id)) return;
+            
+            this.messages.push(message);
+            this.renderMessage(message);
+            this.scrollToBottom();
+            this.advanceSeq(message.seq);
+        });
+        
+        this.eventSource.addEventListener('delete', (e) => {
+            const { id, seq } = JSON.parse(e.data);
+            this.messages = this.messages.filter(m => m.id !== id);
+            this.renderAll();
+            this.advanceSeq(seq);
+        });
+        
+        this.eventSource.addEventListener('clear', (e) => {
+            const { seq } = JSON.parse(e.data);
+            this.messages = [];
+            this.renderAll();
+            this.advanceSeq(seq);
+        });
+    }
+
+    disconnectStream() {
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
+        }
+    }
+
+    renderAll() {
+        this.messagesContainer.innerHTML = '';
+        this.messages.forEach(msg => {
+            this.renderMessage(msg);
+        });
+        this.scrollToBottom();
+    }
+
     stopPolling() {
         if (this.pollInterval) {
             clearInterval(this.pollInterval);
@@ -167,9 +255,10 @@ class ChatApp {
 document.addEventListener('DOMContentLoaded', () => {
     const app = new ChatApp();
     
-    // 页面卸载时停止轮询
+    // 页面卸载时停止轮询并关闭实时连接
     window.addEventListener('beforeunload', () => {
         app.stopPolling();
+        app.disconnectStream();
     });
 });
 
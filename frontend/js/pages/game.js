@@ -7,13 +7,18 @@
 
 import { toast } from '/js/components/Toast.js';
 
+// 游戏网格每页数量及需要的字段
+const GAME_PAGE_SIZE = 60;
+const GAME_GRID_FIELDS = 'id,title,thumbnail,author_name,excerpt,game_file';
+
 class GamePage {
     constructor(stateManager) {
         this.stateManager = stateManager;
         
         this.currentUser = null;  // 当前登录用户
         this.currentGame = null;  // 当前查看的游戏
-        this.games = [];          // 游戏列表
+        this.games = [];          // 游戏列表（已加载的页）
+        this.nextCursor = null;   // 游戏列表下一页游标
         this.myGames = [];        // 我的游戏列表
         this.container = null;    // 容器元素
         
@@ -73,10 +78,10 @@ class GamePage {
      */
     async renderList() {
         try {
-            // 获取已发布的游戏列表
-            const response = await fetch('/api/game/list');
-            const data = await response.json();
+            // 分页获取已发布的游戏，只取网格需要的字段
+            const data = await this.fetchGamePage(null);
             this.games = data.games || [];
+            this.nextCursor = data.next_cursor || null;
 
             // 渲染HTML
             let html = '';
@@ -98,29 +103,15 @@ class GamePage {
                 `;
             } else {
                 // 4399 风格网格布局（一行15个）
-                html += '<div class="game-grid">';
+                html += `<div class="game-grid">${this.renderGameCards(this.games)}</div>`;
                 
-                this.games.forEach(game => {
-                    // 截取简介（最多50字）
-                    const shortDesc = game.content ? 
-                        (game.content.length > 50 ? game.content.substring(0, 50) + '...' : game.content) : 
-                        '';
-                    
+                if (this.nextCursor) {
                     html += `
-                        <div class="game-card" data-game-id="${game.id}">
-                            <div class="game-thumbnail">
-                                <img src="${game.thumbnail}" alt="${game.title}">
-                            </div>
-                            <div class="game-info">
-                                <div class="game-title">${this.escapeHtml(game.title)}</div>
-                                <div class="game-author">${this.escapeHtml(game.author_name)}</div>
-                                ${shortDesc ? `<div class="game-desc">${this.escapeHtml(shortDesc)}</div>` : ''}
-                            </div>
+                        <div class="game-load-more" style="text-align: center; margin-top: 1rem;">
+                            <a href="#" class="action-link" id="load-more-games-btn">加载更多</a>
                         </div>
                     `;
-                });
-                
-                html += '</div>';
+                }
             }
 
             this.container.innerHTML = html;
@@ -134,6 +125,67 @@ class GamePage {
         }
     }
 
+    /**
+     * 获取一页游戏列表
+     */
+    async fetchGamePage(cursor) {
+        const params = new URLSearchParams({
+            limit: GAME_PAGE_SIZE,
+            fields: GAME_GRID_FIELDS
+        });
+        if (cursor) {
+            params.set('cursor', cursor);
+        }
+        const response = await fetch(`/api/game/list?${params}`);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        return response.json();
+    }
+
+    /**
+     * 渲染游戏卡片
+     */
+    renderGameCards(games) {
+        return games.map(game => `
+            <div class="game-card" data-game-id="${game.id}">
+                <div class="game-thumbnail">
+                    <img src="${game.thumbnail}" alt="${this.escapeHtml(game.title)}">
+                </div>
+                <div class="game-info">
+                    <div class="game-title">${this.escapeHtml(game.title)}</div>
+                    <div class="game-author">${this.escapeHtml(game.author_name)}</div>
+                    ${game.excerpt ? `<div class="game-desc">${this.escapeHtml(game.excerpt)}</div>` : ''}
+                </div>
+            </div>
+        `).join('');
+    }
+
+    /**
+     * 加载下一页并追加到网格
+     */
+    async loadMoreGames(button) {
+        if (!this.nextCursor || this.loadingMore) return;
+        this.loadingMore = true;
+        
+        try {
+            const data = await this.fetchGamePage(this.nextCursor);
+            const games = data.games || [];
+            this.games = this.games.concat(games);
+            this.nextCursor = data.next_cursor || null;
+            
+            this.container.querySelector('.game-grid').insertAdjacentHTML('beforeend', this.renderGameCards(games));
+            if (!this.nextCursor) {
+                button.parentElement.remove();
+            }
+        } catch (error) {
+            console.error('加载游戏列表失败:', error);
+            toast.error('加载失败，请重试');
+        } finally {
+            this.loadingMore = false;
+        }
+    }
+
     /**
      * 绑定列表页事件
      */
@@ -147,18 +199,28 @@ class GamePage {
             });
         }
 
-        // 游戏卡片点击 - 直接打开游戏
-        const gameCards = this.container.querySelectorAll('.game-card');
-        gameCards.forEach(card => {
-            card.addEventListener('click', () => {
-                const gameId = card.dataset.gameId;
-                const game = this.games.find(g => g.id === gameId);
+        // 加载更多
+        const loadMoreBtn = document.getElementById('load-more-games-btn');
+        if (loadMoreBtn) {
+            loadMoreBtn.addEventListener('click', (e) => {
+                e.preventDefault();
+                this.loadMoreGames(loadMoreBtn);
+            });
+        }
+
+        // 游戏卡片点击 - 直接打开游戏（事件委托，覆盖后续加载的卡片）
+        const grid = this.container.querySelector('.game-grid');
+        if (grid) {
+            grid.addEventListener('click', (e) => {
+                const card = e.target.closest('.game-card');
+                if (!card) return;
+                const game = this.games.find(g => g.id === card.dataset.gameId);
                 if (game) {
                     // 直接在新标签页打开游戏
                     window.open(game.game_file, '_blank');
                 }
             });
-        });
+        }
     }
 
     /**
@@ -3,6 +3,7 @@
 开发模式：先运行"提交git前运行.py"清空数据，再运行此脚本重建空结构
 """
 import json
+import shutil
 from pathlib import Path
 
 print('\n开始初始化 data 目录...')
@@ -47,6 +48,9 @@ print('\n[3] 初始化聊天文件...')
 chat_file = DATA_DIR / "chat" / "messages.json"
 with open(chat_file, 'w', encoding='utf-8') as f:
     json.dump({"messages": []}, f, ensure_ascii=False, indent=2)
+(DATA_DIR / "chat" / "messages.log").unlink(missing_ok=True)
+# 序号从 0 重新开始，旧归档的序号范围会导致新消息被当作已归档而跳过
+shutil.rmtree(DATA_DIR / "chat" / "archive", ignore_errors=True)
 print('    OK messages.json')
 
 # 4. 读取配置文件获取管理员邮箱
@@ -0,0 +1,38 @@
+"""
+响应缓存键测试
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from starlette.requests import Request
+
+from backend.utils.response_cache import cache_key
+
+
+def make_request(path: str, query_string: str) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query_string.encode("latin-1"),
+        "headers": []
+    })
+
+
+def test_encoded_separators_do_not_collide():
+    """一个包含 %26 / %3D 的参数不能与真正的多个参数得到相同的缓存键"""
+    fields = "id,title,thumbnail,author_name,excerpt,game_file"
+    real = make_request("/api/game/list", f"limit=60&fields={fields}")
+    forged = make_request(
+        "/api/game/list",
+        "fields%3Did%2Ctitle%2Cthumbnail%2Cauthor_name%2Cexcerpt%2Cgame_file%26limit=60"
+    )
+    assert cache_key(real) != cache_key(forged)
+
+
+def test_parameter_order_does_not_matter():
+    a = make_request("/api/game/list", "limit=60&cursor=abc")
+    b = make_request("/api/game/list", "cursor=abc&limit=60")
+    assert cache_key(a) == cache_key(b)